@@ -308,6 +308,9 @@ async def mpesa_callback(
         if not checkout_request_id:
             return {"status": "error", "message": "Invalid callback data"}
 
+        # Keep the local status cache in sync so polling skips Daraja
+        MpesaService.cache_stk_result(checkout_request_id, stk_callback)
+
         # Find payment record
         payment = supabase.table("payments").select("*").eq(
             "mpesa_checkout_request_id", checkout_request_id
@@ -28,6 +28,7 @@ async def websocket_endpoint(
         ws://localhost:8000/api/v1/ws (with cookies)
     """
     user_id = None
+    role = None
 
     try:
         # Try token-based auth first
@@ -38,6 +39,7 @@ async def websocket_endpoint(
             try:
                 payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
                 user_id = payload.get("sub")
+                role = payload.get("role")
                 
                 # Verify token type (accept both access and websocket tokens)
                 token_type = payload.get("type")
@@ -61,7 +63,7 @@ async def websocket_endpoint(
             return
 
         # Accept connection
-        await manager.connect(websocket, user_id)
+        await manager.connect(websocket, user_id, role)
 
         # Send connection acknowledgment
         await websocket.send_json({
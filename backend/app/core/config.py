@@ -73,6 +73,12 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: str = ""  # Gmail app password
     EMAIL_FROM: str = ""  # From email address (same as SMTP_USER)
     EMAIL_FROM_NAME: str = "Premier Hotel"
+    # Where compiled email templates are cached between restarts
+    # (defaults to <tmp>/premier_jinja_bc)
+    EMAIL_TEMPLATE_CACHE_DIR: str = ""
+    # Strip indentation and comments from email HTML (set False locally
+    # to get readable output)
+    EMAIL_MINIFY_HTML: bool = True
 
     # Cloudinary Configuration
     CLOUDINARY_CLOUD_NAME: str = ""
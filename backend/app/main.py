@@ -293,6 +293,15 @@ async def startup():
     except Exception as e:
         logger.warning(f"DB warmup failed (non-fatal): {e}")
 
+    # Compile the email templates now rather than on the first send
+    try:
+        from app.templates.emails import warmup as warmup_email_templates
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, warmup_email_templates)
+        logger.info("✅ Email templates compiled")
+    except Exception as e:
+        logger.warning(f"Email template warmup failed (non-fatal): {e}")
+
     # Start keepalive background task
     _keepalive_task = asyncio.create_task(_db_keepalive())
     logger.info("✅ DB keepalive task started (pings every 4 min to prevent cold starts)")
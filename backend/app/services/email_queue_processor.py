@@ -40,72 +40,74 @@ async def process_email_queue(supabase: Client, limit: int = 10) -> int:
 
         emails_processed = 0
 
-        for email_record in result.data:
-            try:
-                # Mark as processing
-                supabase.table("email_queue").update({
-                    "status": "processing",
-                    "updated_at": datetime.now().isoformat()
-                }).eq("id", email_record["id"]).execute()
-
-                # Determine email type and send
-                success = False
-                email_type = email_record.get("email_type", "generic")
-
-                if email_type == "booking_confirmation":
-                    success = send_booking_confirmation_email(
-                        to_email=email_record["to_email"],
-                        booking_data=email_record["data"]
-                    )
-                elif email_type == "payment_receipt":
-                    success = send_payment_receipt_email(
-                        to_email=email_record["to_email"],
-                        payment_data=email_record["data"]
-                    )
-                elif email_type == "order_confirmation":
-                    success = send_order_confirmation_email(
-                        to_email=email_record["to_email"],
-                        order_data=email_record["data"]
-                    )
-                else:
-                    # Generic notification
-                    success = send_notification_email(
-                        to_email=email_record["to_email"],
-                        notification_data=email_record["data"]
-                    )
-
-                # Update queue status
-                if success:
-                    supabase.table("email_queue").update({
-                        "status": "sent",
-                        "sent_at": datetime.now().isoformat(),
-                        "updated_at": datetime.now().isoformat()
-                    }).eq("id", email_record["id"]).execute()
-
-                    emails_processed += 1
-                    logger.info(f"Successfully sent email to {email_record['to_email']}")
-                else:
-                    # Mark as failed
+        # One SMTP session for the whole batch
+        with email_service.batch():
+            for email_record in result.data:
+                try:
+                    # Mark as processing
                     supabase.table("email_queue").update({
-                        "status": "failed",
-                        "error_message": "Failed to send email via SMTP",
+                        "status": "processing",
                         "updated_at": datetime.now().isoformat()
                     }).eq("id", email_record["id"]).execute()
 
-                    logger.error(f"Failed to send email to {email_record['to_email']}")
+                    # Determine email type and send
+                    success = False
+                    email_type = email_record.get("email_type", "generic")
+
+                    if email_type == "booking_confirmation":
+                        success = send_booking_confirmation_email(
+                            to_email=email_record["to_email"],
+                            booking_data=email_record["data"]
+                        )
+                    elif email_type == "payment_receipt":
+                        success = send_payment_receipt_email(
+                            to_email=email_record["to_email"],
+                            payment_data=email_record["data"]
+                        )
+                    elif email_type == "order_confirmation":
+                        success = send_order_confirmation_email(
+                            to_email=email_record["to_email"],
+                            order_data=email_record["data"]
+                        )
+                    else:
+                        # Generic notification
+                        success = send_notification_email(
+                            to_email=email_record["to_email"],
+                            notification_data=email_record["data"]
+                        )
+
+                    # Update queue status
+                    if success:
+                        supabase.table("email_queue").update({
+                            "status": "sent",
+                            "sent_at": datetime.now().isoformat(),
+                            "updated_at": datetime.now().isoformat()
+                        }).eq("id", email_record["id"]).execute()
+
+                        emails_processed += 1
+                        logger.info(f"Successfully sent email to {email_record['to_email']}")
+                    else:
+                        # Mark as failed
+                        supabase.table("email_queue").update({
+                            "status": "failed",
+                            "error_message": "Failed to send email via SMTP",
+                            "updated_at": datetime.now().isoformat()
+                        }).eq("id", email_record["id"]).execute()
+
+                        logger.error(f"Failed to send email to {email_record['to_email']}")
 
-            except Exception as e:
-                logger.error(f"Error processing email {email_record['id']}: {str(e)}")
+                except Exception as e:
+                    logger.error(f"Error processing email {email_record['id']}: {str(e)}")
 
-                # Mark as failed
-                try:
-                    supabase.table("email_queue").update({
-                        "status": "failed",
-                        "error_message": str(e),
-                        "updated_at": datetime.now().isoformat()
-                    }).eq("id", email_record["id"]).execute()
-                except Exception as update_error:
-                    logger.error(f"Failed to update email status: {str(update_error)}")
+                    # Mark as failed
+                    try:
+                        supabase.table("email_queue").update({
+                            "status": "failed",
+                            "error_message": str(e),
+                            "updated_at": datetime.now().isoformat()
+                        }).eq("id", email_record["id"]).execute()
+                    except Exception as update_error:
+                        logger.error(f"Failed to update email status: {str(update_error)}")
 
         logger.info(f"Processed {emails_processed} out of {len(result.data)} emails")
         return emails_processed
@@ -294,11 +296,13 @@ class EmailQueueProcessor:
 
             logger.info(f"📧 Processing {len(emails)} emails from queue")
 
-            for email_record in emails:
-                try:
-                    await self._process_single_email(email_record)
-                except Exception as e:
-                    logger.error(f"Error processing email {email_record.get('id')}: {str(e)}")
+            # One SMTP session for the whole batch
+            with email_service.batch():
+                for email_record in emails:
+                    try:
+                        await self._process_single_email(email_record)
+                    except Exception as e:
+                        logger.error(f"Error processing email {email_record.get('id')}: {str(e)}")
 
         except Exception as e:
             logger.error(f"Error fetching email batch: {str(e)}")
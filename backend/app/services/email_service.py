@@ -5,16 +5,33 @@ Processes email queue and sends emails using Gmail SMTP
 
 import smtplib
 import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, Optional
 from datetime import datetime
-from jinja2 import Template
+from decimal import Decimal
 from app.core.config import settings
+from app.templates.emails._env import EmailTemplate
 
 logger = logging.getLogger(__name__)
 
 
+class _Batch:
+    """SMTP connection shared by the sends inside one batch() block"""
+    __slots__ = ("server",)
+
+    def __init__(self):
+        self.server: Optional[smtplib.SMTP] = None
+
+
+# The open batch, if any. A context variable rather than an attribute, so only
+# the task (or thread) that opened the batch sends over it; e.g. an OTP sent
+# by a request handler while the queue processor awaits never picks it up.
+_current_batch: ContextVar[Optional[_Batch]] = ContextVar("smtp_batch", default=None)
+
+
 class EmailService:
     """Email service using Gmail SMTP"""
 
@@ -26,6 +43,66 @@ class EmailService:
         self.from_email = getattr(settings, 'EMAIL_FROM', self.smtp_user)
         self.from_name = getattr(settings, 'EMAIL_FROM_NAME', 'Premier Hotel')
 
+    def _connect(self) -> smtplib.SMTP:
+        """Open an authenticated SMTP connection"""
+        server = smtplib.SMTP(self.smtp_host, self.smtp_port)
+        try:
+            server.starttls()  # Upgrade to secure connection
+            server.login(self.smtp_user, self.smtp_password)
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Send every email inside the block over one SMTP connection, so a
+        queue run pays the connect/TLS/login round trips once instead of per
+        message. The connection is only used by the task that opened the
+        batch. If the server drops it (e.g. for idleness), it is reopened and
+        the message resent; after any other SMTP error, or if it can't be
+        opened, the rest of the batch falls back to a connection per message.
+        """
+        if _current_batch.get() is not None or not self.smtp_user or not self.smtp_password:
+            yield
+            return
+
+        batch = _Batch()
+        try:
+            batch.server = self._connect()
+        except Exception as e:
+            logger.error(f"Could not open SMTP session for batch: {str(e)}")
+
+        token = _current_batch.set(batch)
+        try:
+            yield
+        finally:
+            _current_batch.reset(token)
+            server, batch.server = batch.server, None
+            if server is not None:
+                try:
+                    server.quit()
+                except Exception:
+                    server.close()
+
+    def _send_in_batch(self, batch: _Batch, msg: MIMEMultipart) -> None:
+        """Send over the batch connection, reconnecting once if it was dropped"""
+        try:
+            try:
+                batch.server.send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                batch.server.close()
+                batch.server = None
+                batch.server = self._connect()
+                batch.server.send_message(msg)
+        except Exception:
+            # Don't reuse a connection left in an unknown state
+            if batch.server is not None:
+                batch.server.close()
+                batch.server = None
+            raise
+
     def send_email(
         self,
         to_email: str,
@@ -65,11 +142,14 @@ class EmailService:
             part2 = MIMEText(html_content, 'html')
             msg.attach(part2)
 
-            # Connect to Gmail SMTP
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()  # Upgrade to secure connection
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
+            # Reuse the batch connection if this task has one open
+            batch = _current_batch.get()
+            if batch is not None and batch.server is not None:
+                self._send_in_batch(batch, msg)
+            else:
+                # Connect to Gmail SMTP
+                with self._connect() as server:
+                    server.send_message(msg)
 
             logger.info(f"Email sent successfully to {to_email}")
             return True
@@ -88,7 +168,7 @@ class EmailService:
         self,
         to_email: str,
         subject: str,
-        template_html: str,
+        template: EmailTemplate,
         template_vars: Dict[str, Any]
     ) -> bool:
         """
@@ -97,15 +177,14 @@ class EmailService:
         Args:
             to_email: Recipient email address
             subject: Email subject
-            template_html: HTML template string with Jinja2 variables
+            template: Prepared email template, e.g. a template module's TEMPLATE;
+                it escapes template_vars itself
             template_vars: Dictionary of variables to render in template
 
         Returns:
             bool: True if sent successfully, False otherwise
         """
         try:
-            # Render template with autoescape enabled for security
-            template = Template(template_html, autoescape=True)
             html_content = template.render(**template_vars)
 
             # Send email
@@ -120,21 +199,39 @@ class EmailService:
 email_service = EmailService()
 
 
+def _format_amount(value: Any) -> Any:
+    """Format a numeric amount as '12,345.00'; anything else is returned as-is"""
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return f"{value:,.2f}"
+    return value
+
+
+def _with_formatted_amounts(data: Dict[str, Any], *keys: str) -> Dict[str, Any]:
+    """
+    Copy of data with the given amount fields pre-formatted, so templates
+    only interpolate strings and need no number formatting per render
+    """
+    formatted = dict(data)
+    for key in keys:
+        if key in formatted:
+            formatted[key] = _format_amount(formatted[key])
+    return formatted
+
+
 def send_booking_confirmation_email(
     to_email: str,
     booking_data: Dict[str, Any]
 ) -> bool:
     """Send booking confirmation email"""
-    from app.templates.emails.booking_confirmation import get_template
+    from app.templates.emails.booking_confirmation import TEMPLATE
 
     subject = f"Booking Confirmation - {booking_data.get('booking_number', 'N/A')}"
-    template_html = get_template()
 
     return email_service.send_template_email(
         to_email=to_email,
         subject=subject,
-        template_html=template_html,
-        template_vars=booking_data
+        template=TEMPLATE,
+        template_vars=_with_formatted_amounts(booking_data, "total_amount")
     )
 
 
@@ -143,16 +240,14 @@ def send_payment_receipt_email(
     payment_data: Dict[str, Any]
 ) -> bool:
     """Send payment receipt email"""
-    from app.templates.emails.payment_receipt import get_template
+    from app.templates.emails.payment_receipt import render
 
     subject = f"Payment Receipt - {payment_data.get('payment_id', 'N/A')}"
-    template_html = get_template()
 
-    return email_service.send_template_email(
+    return email_service.send_email(
         to_email=to_email,
         subject=subject,
-        template_html=template_html,
-        template_vars=payment_data
+        html_content=render(**_with_formatted_amounts(payment_data, "amount"))
     )
 
 
@@ -161,16 +256,20 @@ def send_order_confirmation_email(
     order_data: Dict[str, Any]
 ) -> bool:
     """Send order confirmation email"""
-    from app.templates.emails.order_confirmation import get_template
+    from app.templates.emails.order_confirmation import render
 
     subject = f"Order Confirmation - #{order_data.get('order_number', 'N/A')}"
-    template_html = get_template()
+    order_data = _with_formatted_amounts(order_data, "total_amount")
+    if isinstance(order_data.get("items"), list):
+        order_data["items"] = [
+            _with_formatted_amounts(item, "total_price") if isinstance(item, dict) else item
+            for item in order_data["items"]
+        ]
 
-    return email_service.send_template_email(
+    return email_service.send_email(
         to_email=to_email,
         subject=subject,
-        template_html=template_html,
-        template_vars=order_data
+        html_content=render(**order_data)
     )
 
 
@@ -179,15 +278,14 @@ def send_notification_email(
     notification_data: Dict[str, Any]
 ) -> bool:
     """Send generic notification email"""
-    from app.templates.emails.notification import get_template
+    from app.templates.emails.notification import TEMPLATE
 
     subject = notification_data.get('title', 'Notification from Premier Hotel')
-    template_html = get_template()
 
     return email_service.send_template_email(
         to_email=to_email,
         subject=subject,
-        template_html=template_html,
+        template=TEMPLATE,
         template_vars=notification_data
     )
 
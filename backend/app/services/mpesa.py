@@ -2,10 +2,48 @@
 M-Pesa Daraja API Integration Service
 """
 import base64
+import time
 import httpx
+from collections import OrderedDict
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from app.core.config import settings
+from app.core.cache import cache_get, cache_set
+
+# How long a final STK result (from the callback or a query) is reused.
+# Errors and "still processing" replies are never cached, so the next poll
+# asks Daraja again.
+STK_STATUS_FINAL_TTL = 3600
+
+# Tokens are dropped from the cache this many seconds before Daraja expires them
+TOKEN_EXPIRY_MARGIN = 60
+
+# Every STK push has its own checkout request ID, so statuses are kept in a
+# bounded LRU rather than the shared cache, which never drops keys that are
+# not read again. The cache is per worker: a callback handled by one worker
+# doesn't reach the others, which fall back to querying Daraja.
+STK_STATUS_CACHE_SIZE = 1024
+_stk_status: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+
+def _get_stk_status(checkout_request_id: str) -> Optional[Dict[str, Any]]:
+    """Cached status for a checkout request, or None if missing or expired"""
+    entry = _stk_status.get(checkout_request_id)
+    if entry is None:
+        return None
+    if entry[0] <= time.monotonic():
+        del _stk_status[checkout_request_id]
+        return None
+    _stk_status.move_to_end(checkout_request_id)
+    return entry[1]
+
+
+def _set_stk_status(checkout_request_id: str, result: Dict[str, Any], ttl: int) -> None:
+    """Cache a status, evicting the least recently used beyond the size limit"""
+    _stk_status[checkout_request_id] = (time.monotonic() + ttl, result)
+    _stk_status.move_to_end(checkout_request_id)
+    while len(_stk_status) > STK_STATUS_CACHE_SIZE:
+        _stk_status.popitem(last=False)
 
 
 class MpesaService:
@@ -40,9 +78,17 @@ class MpesaService:
         """
         Get OAuth access token from M-Pesa API
 
+        Tokens are reused from the local cache until shortly before they
+        expire, so STK push / query calls don't each pay an OAuth round-trip.
+
         Returns:
             Access token string or None if failed
         """
+        cache_args = {"consumer_key": self.consumer_key, "environment": self.environment}
+        cached = cache_get("mpesa_token", **cache_args)
+        if cached:
+            return cached
+
         url = f"{self.base_url}/oauth/v1/generate?grant_type=client_credentials"
 
         # Create basic auth credentials
@@ -60,7 +106,11 @@ class MpesaService:
 
                 if response.status_code == 200:
                     data = response.json()
-                    return data.get('access_token')
+                    token = data.get('access_token')
+                    if token:
+                        ttl = int(data.get('expires_in', 3599)) - TOKEN_EXPIRY_MARGIN
+                        cache_set("mpesa_token", token, ttl=max(ttl, 0), **cache_args)
+                    return token
                 else:
                     print(f"Failed to get access token: {response.text}")
                     return None
@@ -173,16 +223,32 @@ class MpesaService:
                 "message": f"Error initiating payment: {str(e)}"
             }
 
-    async def query_stk_status(self, checkout_request_id: str) -> Dict[str, Any]:
+    async def query_stk_status(
+        self,
+        checkout_request_id: str,
+        *,
+        fresh: bool = False
+    ) -> Dict[str, Any]:
         """
         Query the status of an STK push transaction
 
+        Final results are served from the local cache when available
+        (populated by the M-Pesa callback or an earlier query) so status
+        polling from the frontend stops hitting Daraja once the payment has
+        an outcome.
+
         Args:
             checkout_request_id: The checkout request ID from STK push
+            fresh: Skip the cache and always query Daraja
 
         Returns:
             Dictionary with transaction status
         """
+        if not fresh:
+            cached = _get_stk_status(checkout_request_id)
+            if cached is not None:
+                return cached
+
         # Get access token
         access_token = await self.get_access_token()
         if not access_token:
@@ -219,7 +285,7 @@ class MpesaService:
 
                 data = response.json()
 
-                return {
+                result = {
                     "success": True,
                     "result_code": data.get('ResultCode'),
                     "result_desc": data.get('ResultDesc'),
@@ -227,12 +293,38 @@ class MpesaService:
                     "response_description": data.get('ResponseDescription'),
                     "data": data
                 }
+                # Daraja only includes a ResultCode once the payment has a final
+                # outcome; error and pending responses carry an errorCode instead
+                if response.status_code == 200 and data.get('ResultCode') is not None:
+                    _set_stk_status(checkout_request_id, result, STK_STATUS_FINAL_TTL)
+                return result
         except Exception as e:
             return {
                 "success": False,
                 "message": f"Error querying status: {str(e)}"
             }
 
+    @staticmethod
+    def cache_stk_result(checkout_request_id: str, stk_callback: Dict[str, Any]) -> None:
+        """
+        Store the final STK result delivered by the M-Pesa callback so later
+        status queries are answered locally instead of calling Daraja.
+
+        Args:
+            checkout_request_id: The checkout request ID from STK push
+            stk_callback: The ``stkCallback`` object from the callback body
+        """
+        _set_stk_status(
+            checkout_request_id,
+            {
+                "success": True,
+                "result_code": stk_callback.get('ResultCode'),
+                "result_desc": stk_callback.get('ResultDesc'),
+                "data": stk_callback
+            },
+            STK_STATUS_FINAL_TTL
+        )
+
 
 # Singleton instance
 mpesa_service = MpesaService()
@@ -5,6 +5,10 @@ import base64
 import httpx
 from typing import Any, Dict, Optional
 from app.core.config import settings
+from app.core.cache import cache_get, cache_set
+
+# Tokens are dropped from the cache this many seconds before PayPal expires them
+TOKEN_EXPIRY_MARGIN = 60
 
 
 class PayPalService:
@@ -21,6 +25,11 @@ class PayPalService:
             self.base_url = "https://api-m.sandbox.paypal.com"
 
     async def _get_access_token(self) -> Optional[str]:
+        cache_args = {"client_id": self.client_id, "base_url": self.base_url}
+        cached = cache_get("paypal_token", **cache_args)
+        if cached:
+            return cached
+
         credentials = base64.b64encode(f"{self.client_id}:{self.secret}".encode()).decode()
         try:
             async with httpx.AsyncClient() as client:
@@ -34,7 +43,12 @@ class PayPalService:
                     timeout=30.0,
                 )
                 if resp.status_code == 200:
-                    return resp.json().get("access_token")
+                    data = resp.json()
+                    token = data.get("access_token")
+                    if token:
+                        ttl = int(data.get("expires_in", 3600)) - TOKEN_EXPIRY_MARGIN
+                        cache_set("paypal_token", token, ttl=max(ttl, 0), **cache_args)
+                    return token
         except Exception:
             pass
         return None
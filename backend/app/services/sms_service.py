@@ -3,10 +3,17 @@ SMS Service using Africa's Talking
 Sends OTP codes and notifications via SMS
 """
 import africastalking
+import asyncio
 import os
 from typing import Optional
 
 
+# The SDK makes its HTTP call with no timeout; give up on an attempt after this
+# many seconds and try once more. A repeated OTP is harmless, a hung request isn't.
+SMS_SEND_TIMEOUT = 10
+SMS_SEND_ATTEMPTS = 2
+
+
 class SMSService:
     """Africa's Talking SMS service"""
     
@@ -45,7 +52,18 @@ class SMSService:
             if self.sender_id:
                 kwargs["sender_id"] = self.sender_id
             
-            response = self.sms.send(**kwargs)
+            # The SDK call blocks, so it runs on a worker thread with a bound
+            for attempt in range(1, SMS_SEND_ATTEMPTS + 1):
+                try:
+                    response = await asyncio.wait_for(
+                        asyncio.to_thread(self.sms.send, **kwargs),
+                        timeout=SMS_SEND_TIMEOUT
+                    )
+                    break
+                except asyncio.TimeoutError:
+                    print(f"⚠️  SMS send timed out after {SMS_SEND_TIMEOUT}s (attempt {attempt}/{SMS_SEND_ATTEMPTS})")
+            else:
+                return False
             
             # Check response
             if response and 'SMSMessageData' in response:
@@ -3,99 +3,184 @@ WebSocket Connection Manager
 Manages WebSocket connections for real-time updates
 """
 
+import asyncio
 import logging
-import json
-from typing import Dict, List, Set
+import time
+import orjson
+from typing import Dict, Iterable, List, Optional, Set, Union
 from fastapi import WebSocket
 from datetime import datetime, timezone
 
 logger = logging.getLogger(__name__)
 
 
-class ConnectionManager:
-    """Manages WebSocket connections"""
+def _encode(message: dict) -> str:
+    """Serialize an event for the wire; datetimes are formatted by orjson"""
+    return orjson.dumps(message, option=orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS).decode()
 
-    def __init__(self):
-        # Store active connections by user_id
-        self.active_connections: Dict[str, List[WebSocket]] = {}
-        # Store user info for each connection
-        self.connection_users: Dict[WebSocket, str] = {}
 
-    async def connect(self, websocket: WebSocket, user_id: str):
-        """Accept a new WebSocket connection"""
-        await websocket.accept()
+# Event timestamps are shared across a ~10ms window so a burst of events
+# formats the current time once instead of once per event.
+_TIMESTAMP_WINDOW = 0.01
+_ts_cache = {"t": float("-inf"), "s": ""}
 
-        # Add connection to user's connection list
-        if user_id not in self.active_connections:
-            self.active_connections[user_id] = []
+# Outgoing messages for a connection are collected for this long and then
+# written as one frame (a JSON array when more than one message is pending).
+_FLUSH_WINDOW = 0.005
 
-        self.active_connections[user_id].append(websocket)
-        self.connection_users[websocket] = user_id
 
-        logger.info(f"WebSocket connected for user {user_id}. Total connections: {self.get_connection_count()}")
+def batch_frame(payloads: List[str]) -> str:
+    """
+    One frame for a connection's pending payloads: a lone message is sent
+    as-is, several as a JSON array, which is what the frontend hooks expect
+    """
+    if len(payloads) == 1:
+        return payloads[0]
+    return "[" + ",".join(payloads) + "]"
 
-    def disconnect(self, websocket: WebSocket):
-        """Remove a WebSocket connection"""
-        if websocket in self.connection_users:
-            user_id = self.connection_users[websocket]
 
-            # Remove from user's connection list
-            if user_id in self.active_connections:
-                self.active_connections[user_id].remove(websocket)
+def now_iso() -> str:
+    """Current UTC time as an ISO-8601 string, cached for _TIMESTAMP_WINDOW"""
+    now = time.monotonic()
+    if now - _ts_cache["t"] > _TIMESTAMP_WINDOW:
+        _ts_cache["t"] = now
+        _ts_cache["s"] = datetime.now(timezone.utc).isoformat()
+    return _ts_cache["s"]
 
-                # Clean up empty lists
-                if not self.active_connections[user_id]:
-                    del self.active_connections[user_id]
 
-            # Remove user mapping
-            del self.connection_users[websocket]
+class ConnectionManager:
+    """Manages WebSocket connections"""
 
-            logger.info(f"WebSocket disconnected for user {user_id}. Total connections: {self.get_connection_count()}")
+    def __init__(self):
+        # Store active connections by user_id; each socket also carries its
+        # user_id on websocket.state so disconnect needs no reverse map
+        self.active_connections: Dict[str, Set[WebSocket]] = {}
+        # Connections indexed by user role, for send_to_role
+        self.role_index: Dict[str, Set[WebSocket]] = {}
+        # Running total of open connections
+        self._total = 0
+
+    async def connect(self, websocket: WebSocket, user_id: str, role: Optional[str] = None):
+        """Accept a new WebSocket connection"""
+        # Already registered: a second writer would leak the first and both
+        # would drain the same outbox
+        writer = getattr(websocket.state, "writer", None)
+        if writer is not None and not writer.done():
+            return
 
-    async def send_personal_message(self, message: dict, user_id: str):
-        """Send a message to a specific user (all their connections)"""
-        if user_id in self.active_connections:
-            disconnected = []
+        await websocket.accept()
 
-            for connection in self.active_connections[user_id]:
-                try:
-                    await connection.send_json(message)
-                except Exception as e:
-                    logger.error(f"Error sending message to user {user_id}: {str(e)}")
-                    disconnected.append(connection)
+        # Add connection to user's connection set
+        if user_id not in self.active_connections:
+            self.active_connections[user_id] = set()
 
-            # Clean up disconnected connections
-            for conn in disconnected:
-                self.disconnect(conn)
+        connections = self.active_connections[user_id]
+        if websocket not in connections:
+            connections.add(websocket)
+            self._total += 1
+        websocket.state.user_id = user_id
+        websocket.state.role = role
+        if role:
+            self.role_index.setdefault(role, set()).add(websocket)
 
-    async def broadcast(self, message: dict, exclude_user: str = None):
-        """Broadcast a message to all connected users (except excluded)"""
-        disconnected = []
+        # Per-connection outbox drained by a writer task
+        websocket.state.outbox = asyncio.Queue()
+        websocket.state.writer = asyncio.create_task(self._writer_loop(websocket))
 
-        for user_id, connections in self.active_connections.items():
-            if exclude_user and user_id == exclude_user:
-                continue
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("WebSocket connected for user %s. Total connections: %d", user_id, self._total)
 
-            for connection in connections:
-                try:
-                    await connection.send_json(message)
-                except Exception as e:
-                    logger.error(f"Error broadcasting to user {user_id}: {str(e)}")
-                    disconnected.append(connection)
+    def disconnect(self, websocket: WebSocket):
+        """Remove a WebSocket connection"""
+        user_id = getattr(websocket.state, "user_id", None)
+        connections = self.active_connections.get(user_id)
+        if not connections or websocket not in connections:
+            return
+
+        # Remove from user's connection set
+        connections.discard(websocket)
+        self._total -= 1
+
+        # Clean up empty sets
+        if not connections:
+            del self.active_connections[user_id]
+
+        role = getattr(websocket.state, "role", None)
+        role_connections = self.role_index.get(role)
+        if role_connections is not None:
+            role_connections.discard(websocket)
+            if not role_connections:
+                del self.role_index[role]
+
+        writer = getattr(websocket.state, "writer", None)
+        if writer is not None and writer is not asyncio.current_task():
+            writer.cancel()
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("WebSocket disconnected for user %s. Total connections: %d", user_id, self._total)
+
+    async def send_personal_message(self, message: Union[dict, str], user_id: str):
+        """
+        Send a message to a specific user (all their connections).
+        Accepts either an event dict or a string already produced by _encode.
+        """
+        if user_id in self.active_connections:
+            payload = message if isinstance(message, str) else _encode(message)
+            self._enqueue(self.active_connections[user_id], payload)
 
-        # Clean up disconnected connections
-        for conn in disconnected:
-            self.disconnect(conn)
+    async def broadcast(self, message: dict, exclude_user: str = None):
+        """Broadcast a message to all connected users (except excluded)"""
+        if not self._total:
+            return
+
+        targets = [
+            connection
+            for user_id, connections in self.active_connections.items()
+            if not (exclude_user and user_id == exclude_user)
+            for connection in connections
+        ]
+        if targets:
+            self._enqueue(targets, _encode(message))
+
+    def _enqueue(self, targets: Iterable[WebSocket], payload: str):
+        """
+        Queue an already-serialized payload on each target's outbox. Encoding
+        once up front avoids re-serializing the same message per connection;
+        the writer tasks deliver concurrently so a slow socket only delays itself.
+        """
+        for connection in targets:
+            connection.state.outbox.put_nowait(payload)
+
+    async def _writer_loop(self, websocket: WebSocket):
+        """Drain a connection's outbox, coalescing bursts into a single frame"""
+        outbox: asyncio.Queue = websocket.state.outbox
+        try:
+            while True:
+                batch = [await outbox.get()]
+                await asyncio.sleep(_FLUSH_WINDOW)
+                while not outbox.empty():
+                    batch.append(outbox.get_nowait())
+
+                await websocket.send_text(batch_frame(batch))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Clean up disconnected connection
+            logger.error(
+                "Error sending message to user %s: %s",
+                getattr(websocket.state, "user_id", None), e
+            )
+            self.disconnect(websocket)
 
     async def send_to_role(self, message: dict, role: str):
         """Send a message to all users with a specific role"""
-        # Note: This requires role information to be passed during connection
-        # For now, this is a placeholder for future implementation
-        pass
+        targets = self.role_index.get(role)
+        if targets:
+            self._enqueue(targets, _encode(message))
 
     def get_connection_count(self) -> int:
         """Get total number of active connections"""
-        return sum(len(connections) for connections in self.active_connections.values())
+        return self._total
 
     def get_connected_users(self) -> Set[str]:
         """Get set of currently connected user IDs"""
@@ -147,64 +232,68 @@ class EventType:
 
 async def send_notification_event(user_id: str, notification_data: dict):
     """Send a notification event to a user"""
-    await manager.send_personal_message({
+    await manager.send_personal_message(_encode({
         "type": EventType.NOTIFICATION,
         "data": notification_data,
-        "timestamp": datetime.now(timezone.utc).isoformat()
-    }, user_id)
+        "timestamp": now_iso()
+    }), user_id)
 
 
 async def send_booking_event(user_id: str, event_type: str, booking_data: dict):
     """Send a booking-related event to a user"""
-    await manager.send_personal_message({
+    await manager.send_personal_message(_encode({
         "type": event_type,
         "data": booking_data,
-        "timestamp": datetime.now(timezone.utc).isoformat()
-    }, user_id)
+        "timestamp": now_iso()
+    }), user_id)
 
 
 async def send_payment_event(user_id: str, event_type: str, payment_data: dict):
     """Send a payment-related event to a user"""
-    await manager.send_personal_message({
+    await manager.send_personal_message(_encode({
         "type": event_type,
         "data": payment_data,
-        "timestamp": datetime.now(timezone.utc).isoformat()
-    }, user_id)
+        "timestamp": now_iso()
+    }), user_id)
 
 
 async def send_order_event(user_id: str, event_type: str, order_data: dict):
     """Send an order-related event to a user"""
-    await manager.send_personal_message({
+    await manager.send_personal_message(_encode({
         "type": event_type,
         "data": order_data,
-        "timestamp": datetime.now(timezone.utc).isoformat()
-    }, user_id)
+        "timestamp": now_iso()
+    }), user_id)
 
 
 async def send_message_event(user_id: str, message_data: dict):
     """Send a new message event to a user"""
-    await manager.send_personal_message({
+    await manager.send_personal_message(_encode({
         "type": EventType.NEW_MESSAGE,
         "data": message_data,
-        "timestamp": datetime.now(timezone.utc).isoformat()
-    }, user_id)
+        "timestamp": now_iso()
+    }), user_id)
 
 
 async def broadcast_room_availability():
     """Broadcast room availability changes to all connected users"""
+    if not manager.get_connection_count():
+        return
     await manager.broadcast({
         "type": EventType.ROOM_AVAILABILITY_CHANGED,
-        "timestamp": datetime.now(timezone.utc).isoformat()
+        "timestamp": now_iso()
     })
 
 
 async def broadcast_announcement(announcement: str, priority: str = "normal"):
     """Broadcast a system announcement to all users"""
+    if not manager.get_connection_count():
+        return
     await manager.broadcast({
         "type": EventType.SYSTEM_ANNOUNCEMENT,
         "data": {
             "message": announcement,
             "priority": priority
         },
-        "timestamp": datetime.now(timezone.utc).isoformat()
+        "timestamp": now_iso()
     })
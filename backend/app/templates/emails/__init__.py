@@ -0,0 +1,19 @@
+"""Email templates package"""
+
+
+def warmup():
+    """
+    Compile and prepare every email template, including the pre-split
+    fast-path pages, so the first email sent by a worker doesn't pay for it.
+    Called once at app startup.
+    """
+    from app.templates.emails import (
+        booking_confirmation,
+        notification,
+        order_confirmation,
+        payment_receipt,
+    )
+
+    # Importing the modules loads their templates; this builds the fast paths
+    order_confirmation._simple_segments()
+    payment_receipt._segments()
@@ -0,0 +1,174 @@
+"""Shared Jinja2 environment for the email templates
+
+Templates live as .html files next to this module and are loaded by name,
+so the environment's template cache serves repeat lookups and compiled
+bytecode is cached on disk and reused across worker restarts instead of
+being recompiled by every new process. Sources never
+change at runtime, so auto_reload is off, and trim_blocks/lstrip_blocks
+keep block tags from leaving blank lines in the rendered HTML.
+
+With EMAIL_MINIFY_HTML on, the loader strips HTML comments and indentation
+from the sources before Jinja sees them, so the minified form is what gets
+compiled and cached and renders cost nothing extra.
+
+Autoescape is off: EmailTemplate escapes the context values once before
+rendering instead of Jinja escaping at every {{ }} site, and all rendering
+must go through EmailTemplate for that reason.
+"""
+import functools
+import hashlib
+import os
+import re
+import tempfile
+from decimal import Decimal
+from typing import Any, BinaryIO, Iterable, Iterator, List, Mapping
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+from jinja2.environment import TemplateStream
+from jinja2.utils import concat
+from markupsafe import escape
+from app.core.config import settings
+
+_BYTECODE_DIR = settings.EMAIL_TEMPLATE_CACHE_DIR or os.path.join(
+    tempfile.gettempdir(), "premier_jinja_bc"
+)
+os.makedirs(_BYTECODE_DIR, exist_ok=True)
+
+# Options that change the generated code. Jinja only checks the template
+# source when loading cached bytecode, so these are fingerprinted into the
+# cache file name to avoid reusing code compiled under other settings.
+_CODEGEN_OPTIONS = {
+    "autoescape": False,
+    "trim_blocks": True,
+    "lstrip_blocks": True,
+}
+_FINGERPRINT = hashlib.sha1(repr(sorted(_CODEGEN_OPTIONS.items())).encode()).hexdigest()[:8]
+
+_HTML_COMMENT = re.compile(r"<!--(?!\[).*?-->", re.S)
+_BETWEEN_TAGS = re.compile(r">\s*\n\s*<")
+_INDENT = re.compile(r"\s*\n\s*")
+
+
+def minify_html(source: str) -> str:
+    """
+    Drop HTML comments, whitespace-only line breaks between tags and
+    indentation. Whitespace inside text is only collapsed to a newline, so
+    the rendered text is unchanged.
+    """
+    source = _HTML_COMMENT.sub("", source)
+    source = _BETWEEN_TAGS.sub("><", source)
+    return _INDENT.sub("\n", source).strip()
+
+
+class _MinifyingLoader(FileSystemLoader):
+    """FileSystemLoader that minifies template sources as they are loaded"""
+
+    def get_source(self, environment, template):
+        source, filename, uptodate = super().get_source(environment, template)
+        return minify_html(source), filename, uptodate
+
+
+_loader_class = _MinifyingLoader if settings.EMAIL_MINIFY_HTML else FileSystemLoader
+
+env = Environment(
+    loader=_loader_class(os.path.dirname(__file__)),
+    autoescape=_CODEGEN_OPTIONS["autoescape"],
+    trim_blocks=_CODEGEN_OPTIONS["trim_blocks"],
+    lstrip_blocks=_CODEGEN_OPTIONS["lstrip_blocks"],
+    auto_reload=False,
+    cache_size=400,
+    bytecode_cache=FileSystemBytecodeCache(
+        directory=_BYTECODE_DIR, pattern=f"__jinja2_{_FINGERPRINT}_%s.cache"
+    ),
+)
+
+
+class _EscapedObject:
+    """
+    Read-only view of a context object (e.g. an order item model) whose
+    attributes come back escaped, so templates can use item.name as before
+    """
+    __slots__ = ("_obj",)
+
+    def __init__(self, obj: Any):
+        self._obj = obj
+
+    def __getattr__(self, name: str) -> Any:
+        return _escape_context(getattr(self._obj, name))
+
+    def __str__(self) -> str:
+        return escape(str(self._obj))
+
+    def __bool__(self) -> bool:
+        return bool(self._obj)
+
+
+def _escape_context(value: Any) -> Any:
+    """
+    HTML-escape every string in a render context, recursing into dicts and
+    lists (e.g. order items). Numbers and None are left alone so comparisons
+    and arithmetic in templates still work; Markup passes through as-is.
+    Other objects are wrapped so their attributes are escaped on access.
+    """
+    if isinstance(value, str):
+        return escape(value)
+    if isinstance(value, dict):
+        return {key: _escape_context(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_escape_context(item) for item in value]
+    if value is None or isinstance(value, (bool, int, float, Decimal)):
+        return value
+    return _EscapedObject(value)
+
+
+# Stands in for the content block while the static layout is pre-rendered
+_CONTENT_MARKER = "\x00content\x00"
+
+
+class EmailTemplate:
+    """
+    An email template whose static layout (everything outside the content
+    block) is rendered once, so each send only runs the content block
+    through Jinja.
+    """
+
+    def __init__(self, name: str):
+        self.template = env.get_template(name)
+        context = self.template.new_context({})
+        context.blocks["content"] = [lambda _context: iter((_CONTENT_MARKER,))]
+        layout = concat(self.template.root_render_func(context))
+        self.prefix, self.suffix = layout.split(_CONTENT_MARKER)
+
+    def render(self, *args, **kwargs) -> str:
+        """Render with the same arguments as jinja2.Template.render"""
+        context = self.template.new_context(_escape_context(dict(*args, **kwargs)))
+        return self.prefix + concat(self.template.blocks["content"](context)) + self.suffix
+
+    def generate(self, *args, **kwargs) -> Iterator[str]:
+        """Yield the rendered HTML piece by piece instead of as one string"""
+        context = self.template.new_context(_escape_context(dict(*args, **kwargs)))
+        yield self.prefix
+        yield from self.template.blocks["content"](context)
+        yield self.suffix
+
+    def stream(self, *args, **kwargs) -> TemplateStream:
+        """Like jinja2.Template.stream, e.g. stream(ctx).dump(fileobj)"""
+        return TemplateStream(self.generate(*args, **kwargs))
+
+    def render_many(self, contexts: Iterable[Mapping[str, Any]]) -> List[str]:
+        """Render one email per context, e.g. for a bulk notification run"""
+        return [self.render(context) for context in contexts]
+
+    def render_to(self, context: Mapping[str, Any], fileobj: BinaryIO) -> None:
+        """
+        Write the rendered email to fileobj as UTF-8 without building the whole
+        HTML string first; fragments are written in groups of 16
+        """
+        stream = self.stream(context)
+        stream.enable_buffering(size=16)
+        stream.dump(fileobj, encoding="utf-8")
+
+
+@functools.lru_cache(maxsize=None)
+def get_email_template(name: str) -> EmailTemplate:
+    """Load an email template by file name, prepared once per process"""
+    return EmailTemplate(name)
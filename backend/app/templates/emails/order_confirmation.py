@@ -1,171 +1,74 @@
-"""Order Confirmation Email Template"""
+"""
+Order Confirmation Email Template
 
-def get_template() -> str:
-    return """
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Order Confirmation</title>
-</head>
-<body style="margin: 0; padding: 0; font-family: Arial, sans-serif; background-color: #f4f4f4;">
-    <table width="100%" cellpadding="0" cellspacing="0" border="0" style="background-color: #f4f4f4; padding: 20px;">
-        <tr>
-            <td align="center">
-                <table width="600" cellpadding="0" cellspacing="0" border="0" style="background-color: #ffffff; border-radius: 8px; overflow: hidden; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
-                    <!-- Header -->
-                    <tr>
-                        <td style="background: linear-gradient(135deg, #f59e0b 0%, #d97706 100%); padding: 40px 30px; text-align: center;">
-                            <h1 style="margin: 0; color: #ffffff; font-size: 28px; font-weight: bold;">
-                                🍽️ Order Confirmed
-                            </h1>
-                            <p style="margin: 10px 0 0 0; color: #ffffff; font-size: 16px;">
-                                Your order has been received
-                            </p>
-                        </td>
-                    </tr>
+total_amount and items[].total_price are expected as pre-formatted strings
+(e.g. "1,250.00"); send_order_confirmation_email formats them before rendering.
 
-                    <!-- Content -->
-                    <tr>
-                        <td style="padding: 40px 30px;">
-                            <p style="margin: 0 0 20px 0; color: #333333; font-size: 16px;">
-                                Dear {{ customer_name }},
-                            </p>
+Most orders are a single item without special instructions. For those the
+page is fixed apart from plain variables, so render() fills in a copy of it
+that was rendered once and split around its variables, and only other
+orders go through Jinja.
+"""
+import functools
+import re
+from typing import Any, Dict, Tuple
+from jinja2 import meta
+from markupsafe import Markup, escape
+from app.templates.emails._env import env, get_email_template
 
-                            <p style="margin: 0 0 30px 0; color: #666666; font-size: 14px; line-height: 1.6;">
-                                Thank you for your order! Our kitchen is preparing your food with care. We'll notify you when it's ready.
-                            </p>
+TEMPLATE_NAME = "order_confirmation.html"
 
-                            <!-- Order Details Box -->
-                            <table width="100%" cellpadding="0" cellspacing="0" border="0" style="background-color: #fffbeb; border-radius: 8px; padding: 20px; margin-bottom: 30px; border: 1px solid #f59e0b;">
-                                <tr>
-                                    <td>
-                                        <h2 style="margin: 0 0 20px 0; color: #333333; font-size: 20px;">
-                                            Order Details
-                                        </h2>
+TEMPLATE = get_email_template(TEMPLATE_NAME)
 
-                                        <table width="100%" cellpadding="8" cellspacing="0" border="0">
-                                            <tr>
-                                                <td style="color: #666666; font-size: 14px; padding: 8px 0;">
-                                                    <strong>Order Number:</strong>
-                                                </td>
-                                                <td style="color: #333333; font-size: 14px; padding: 8px 0; text-align: right;">
-                                                    <strong>#{{ order_number }}</strong>
-                                                </td>
-                                            </tr>
-                                            <tr>
-                                                <td style="color: #666666; font-size: 14px; padding: 8px 0;">
-                                                    Order Time:
-                                                </td>
-                                                <td style="color: #333333; font-size: 14px; padding: 8px 0; text-align: right;">
-                                                    {{ order_time }}
-                                                </td>
-                                            </tr>
-                                            <tr>
-                                                <td style="color: #666666; font-size: 14px; padding: 8px 0;">
-                                                    Delivery Location:
-                                                </td>
-                                                <td style="color: #333333; font-size: 14px; padding: 8px 0; text-align: right;">
-                                                    {{ delivery_location }}
-                                                </td>
-                                            </tr>
-                                            <tr>
-                                                <td style="color: #666666; font-size: 14px; padding: 8px 0;">
-                                                    Estimated Ready Time:
-                                                </td>
-                                                <td style="color: #f59e0b; font-size: 14px; padding: 8px 0; text-align: right;">
-                                                    <strong>{{ estimated_time }} minutes</strong>
-                                                </td>
-                                            </tr>
-                                        </table>
-                                    </td>
-                                </tr>
-                            </table>
+# Item fields shown for an item without special instructions
+_SIMPLE_ITEM_FIELDS = ("quantity", "name", "total_price")
 
-                            <!-- Order Items -->
-                            <h3 style="margin: 0 0 15px 0; color: #333333; font-size: 18px;">Your Items:</h3>
-                            <table width="100%" cellpadding="0" cellspacing="0" border="0" style="background-color: #f8f9fa; border-radius: 8px; padding: 20px; margin-bottom: 30px;">
-                                <tr>
-                                    <td>
-                                        {% for item in items %}
-                                        <table width="100%" cellpadding="8" cellspacing="0" border="0" style="border-bottom: 1px solid #dee2e6; margin-bottom: 10px;">
-                                            <tr>
-                                                <td style="color: #333333; font-size: 14px; padding: 8px 0;">
-                                                    {{ item.quantity }}x {{ item.name }}
-                                                    {% if item.special_instructions %}
-                                                    <br><span style="color: #666666; font-size: 12px; font-style: italic;">{{ item.special_instructions }}</span>
-                                                    {% endif %}
-                                                </td>
-                                                <td style="color: #333333; font-size: 14px; padding: 8px 0; text-align: right;">
-                                                    KES {{ item.total_price }}
-                                                </td>
-                                            </tr>
-                                        </table>
-                                        {% endfor %}
 
-                                        <table width="100%" cellpadding="8" cellspacing="0" border="0" style="margin-top: 20px;">
-                                            <tr>
-                                                <td style="color: #333333; font-size: 16px; padding: 8px 0;">
-                                                    <strong>Total Amount:</strong>
-                                                </td>
-                                                <td style="color: #f59e0b; font-size: 18px; padding: 8px 0; text-align: right;">
-                                                    <strong>KES {{ total_amount }}</strong>
-                                                </td>
-                                            </tr>
-                                        </table>
-                                    </td>
-                                </tr>
-                            </table>
+@functools.lru_cache(maxsize=None)
+def _simple_segments() -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """
+    The page for a one-item order without special instructions, split at
+    each variable: the variable names in order of appearance ("item.name"
+    for the item's fields) and the static HTML around them
+    """
+    source = env.loader.get_source(env, TEMPLATE_NAME)[0]
+    names = meta.find_undeclared_variables(env.parse(source)) - {"items"}
+    context = {name: Markup(f"\x00{name}\x00") for name in names}
+    context["items"] = [
+        {field: Markup(f"\x00item.{field}\x00") for field in _SIMPLE_ITEM_FIELDS}
+    ]
+    rendered = TEMPLATE.render(context)
+    fields = tuple(re.findall("\x00([\\w.]+)\x00", rendered))
+    return fields, tuple(re.split("\x00[\\w.]+\x00", rendered))
 
-                            <!-- Status Info -->
-                            <div style="background-color: #dbeafe; border-left: 4px solid #3b82f6; padding: 15px; margin-bottom: 30px; border-radius: 4px;">
-                                <p style="margin: 0; color: #1e40af; font-size: 14px; line-height: 1.6;">
-                                    <strong>Track Your Order:</strong> You can track the status of your order in real-time from your account dashboard.
-                                </p>
-                            </div>
 
-                            <!-- CTA Button -->
-                            <table width="100%" cellpadding="0" cellspacing="0" border="0" style="margin-bottom: 30px;">
-                                <tr>
-                                    <td align="center">
-                                        <a href="{{ hotel_website }}/my-orders" style="display: inline-block; background: linear-gradient(135deg, #f59e0b 0%, #d97706 100%); color: #ffffff; text-decoration: none; padding: 14px 30px; border-radius: 6px; font-size: 16px; font-weight: bold;">
-                                            Track Your Order
-                                        </a>
-                                    </td>
-                                </tr>
-                            </table>
+def _is_simple(items: Any) -> bool:
+    """A single item without special instructions"""
+    return (
+        isinstance(items, list)
+        and len(items) == 1
+        and isinstance(items[0], dict)
+        and not items[0].get("special_instructions")
+    )
 
-                            <p style="margin: 0 0 20px 0; color: #666666; font-size: 14px; line-height: 1.6;">
-                                If you have any questions about your order, please contact us at <a href="mailto:premierhotel2023@gmail.com" style="color: #f59e0b; text-decoration: none;">premierhotel2023@gmail.com</a>.
-                            </p>
 
-                            <p style="margin: 0; color: #666666; font-size: 14px; line-height: 1.6;">
-                                Enjoy your meal!
-                            </p>
+def _render_simple(context: Dict[str, Any]) -> str:
+    """Render a simple order from the pre-split page, without Jinja"""
+    item = context["items"][0]
+    fields, segments = _simple_segments()
+    parts = [segments[0]]
+    for field, segment in zip(fields, segments[1:]):
+        if field.startswith("item."):
+            value = item.get(field[5:], "")
+        else:
+            value = context.get(field, "")
+        parts.append(escape(value))
+        parts.append(segment)
+    return "".join(parts)
 
-                            <p style="margin: 20px 0 0 0; color: #333333; font-size: 14px;">
-                                Best regards,<br>
-                                <strong>The Premier Hotel Team</strong>
-                            </p>
-                        </td>
-                    </tr>
 
-                    <!-- Footer -->
-                    <tr>
-                        <td style="background-color: #f8f9fa; padding: 30px; text-align: center; border-top: 1px solid #dee2e6;">
-                            <p style="margin: 0 0 10px 0; color: #666666; font-size: 12px;">
-                                © 2025 Premier Hotel. All rights reserved.
-                            </p>
-                            <p style="margin: 0; color: #999999; font-size: 11px;">
-                                This is an automated email. Please do not reply directly to this message.
-                            </p>
-                        </td>
-                    </tr>
-                </table>
-            </td>
-        </tr>
-    </table>
-</body>
-</html>
-    """
+def render(**context) -> str:
+    """Render the email HTML with the given context"""
+    if _is_simple(context.get("items")):
+        return _render_simple(context)
+    return TEMPLATE.render(**context)
@@ -1,149 +1,72 @@
-"""Payment Receipt Email Template"""
+"""
+Payment Receipt Email Template
 
-def get_template() -> str:
-    return """
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Payment Receipt</title>
-</head>
-<body style="margin: 0; padding: 0; font-family: Arial, sans-serif; background-color: #f4f4f4;">
-    <table width="100%" cellpadding="0" cellspacing="0" border="0" style="background-color: #f4f4f4; padding: 20px;">
-        <tr>
-            <td align="center">
-                <table width="600" cellpadding="0" cellspacing="0" border="0" style="background-color: #ffffff; border-radius: 8px; overflow: hidden; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
-                    <!-- Header -->
-                    <tr>
-                        <td style="background: linear-gradient(135deg, #10b981 0%, #059669 100%); padding: 40px 30px; text-align: center;">
-                            <h1 style="margin: 0; color: #ffffff; font-size: 28px; font-weight: bold;">
-                                ✓ Payment Received
-                            </h1>
-                            <p style="margin: 10px 0 0 0; color: #ffffff; font-size: 16px;">
-                                Thank you for your payment
-                            </p>
-                        </td>
-                    </tr>
+amount is expected as a pre-formatted string (e.g. "5,000.00");
+send_payment_receipt_email formats it before rendering.
 
-                    <!-- Content -->
-                    <tr>
-                        <td style="padding: 40px 30px;">
-                            <p style="margin: 0 0 20px 0; color: #333333; font-size: 16px;">
-                                Dear {{ customer_name }},
-                            </p>
+The receipt only substitutes plain variables (no loops or conditionals), so
+the Jinja template is rendered once and split around its variables, and sends
+join the static pieces with the escaped values given positionally, without
+going through Jinja or building a context.
+"""
+import functools
+import re
+from typing import Any, Sequence, Tuple
+from jinja2 import meta
+from markupsafe import Markup, escape
+from app.templates.emails._env import env, get_email_template
 
-                            <p style="margin: 0 0 30px 0; color: #666666; font-size: 14px; line-height: 1.6;">
-                                Your payment has been successfully processed. Here's your receipt for your records.
-                            </p>
+TEMPLATE_NAME = "payment_receipt.html"
 
-                            <!-- Payment Details Box -->
-                            <table width="100%" cellpadding="0" cellspacing="0" border="0" style="background-color: #f0fdf4; border-radius: 8px; padding: 20px; margin-bottom: 30px; border: 1px solid #10b981;">
-                                <tr>
-                                    <td>
-                                        <h2 style="margin: 0 0 20px 0; color: #333333; font-size: 20px;">
-                                            Payment Receipt
-                                        </h2>
+TEMPLATE = get_email_template(TEMPLATE_NAME)
 
-                                        <table width="100%" cellpadding="8" cellspacing="0" border="0">
-                                            <tr>
-                                                <td style="color: #666666; font-size: 14px; padding: 8px 0;">
-                                                    <strong>Payment ID:</strong>
-                                                </td>
-                                                <td style="color: #333333; font-size: 14px; padding: 8px 0; text-align: right;">
-                                                    {{ payment_id }}
-                                                </td>
-                                            </tr>
-                                            <tr>
-                                                <td style="color: #666666; font-size: 14px; padding: 8px 0;">
-                                                    Transaction ID:
-                                                </td>
-                                                <td style="color: #333333; font-size: 14px; padding: 8px 0; text-align: right;">
-                                                    {{ transaction_id }}
-                                                </td>
-                                            </tr>
-                                            <tr>
-                                                <td style="color: #666666; font-size: 14px; padding: 8px 0;">
-                                                    Payment Method:
-                                                </td>
-                                                <td style="color: #333333; font-size: 14px; padding: 8px 0; text-align: right;">
-                                                    {{ payment_method }}
-                                                </td>
-                                            </tr>
-                                            <tr>
-                                                <td style="color: #666666; font-size: 14px; padding: 8px 0;">
-                                                    Date:
-                                                </td>
-                                                <td style="color: #333333; font-size: 14px; padding: 8px 0; text-align: right;">
-                                                    {{ payment_date }}
-                                                </td>
-                                            </tr>
-                                            <tr>
-                                                <td style="color: #666666; font-size: 14px; padding: 8px 0;">
-                                                    Reference:
-                                                </td>
-                                                <td style="color: #333333; font-size: 14px; padding: 8px 0; text-align: right;">
-                                                    {{ reference_type }} - {{ reference_number }}
-                                                </td>
-                                            </tr>
-                                            <tr style="border-top: 2px solid #10b981;">
-                                                <td style="color: #333333; font-size: 18px; padding: 12px 0;">
-                                                    <strong>Amount Paid:</strong>
-                                                </td>
-                                                <td style="color: #10b981; font-size: 22px; padding: 12px 0; text-align: right;">
-                                                    <strong>KES {{ amount }}</strong>
-                                                </td>
-                                            </tr>
-                                        </table>
-                                    </td>
-                                </tr>
-                            </table>
+# Template variables in the order they appear, for positional rendering
+FIELDS = (
+    "customer_name",
+    "payment_id",
+    "transaction_id",
+    "payment_method",
+    "payment_date",
+    "reference_type",
+    "reference_number",
+    "amount",
+    "hotel_website",
+)
 
-                            <!-- Success Message -->
-                            <div style="background-color: #d1fae5; border-left: 4px solid #10b981; padding: 15px; margin-bottom: 30px; border-radius: 4px;">
-                                <p style="margin: 0; color: #065f46; font-size: 14px; line-height: 1.6;">
-                                    <strong>✓ Payment Successful</strong><br>
-                                    Your payment has been confirmed and processed successfully. This receipt serves as proof of payment.
-                                </p>
-                            </div>
 
-                            <!-- CTA Button -->
-                            <table width="100%" cellpadding="0" cellspacing="0" border="0" style="margin-bottom: 30px;">
-                                <tr>
-                                    <td align="center">
-                                        <a href="{{ hotel_website }}/my-bookings" style="display: inline-block; background: linear-gradient(135deg, #10b981 0%, #059669 100%); color: #ffffff; text-decoration: none; padding: 14px 30px; border-radius: 6px; font-size: 16px; font-weight: bold;">
-                                            View Your Account
-                                        </a>
-                                    </td>
-                                </tr>
-                            </table>
+@functools.lru_cache(maxsize=None)
+def _segments() -> Tuple[str, ...]:
+    """
+    The fully rendered receipt split at each variable, in FIELDS order: the
+    static HTML between the variables, one more piece than there are fields
+    """
+    markers = {name: Markup(f"\x00{name}\x00") for name in FIELDS}
+    rendered = TEMPLATE.render(markers)
 
-                            <p style="margin: 0 0 20px 0; color: #666666; font-size: 14px; line-height: 1.6;">
-                                If you have any questions about this payment, please contact us at <a href="mailto:premierhotel2023@gmail.com" style="color: #10b981; text-decoration: none;">premierhotel2023@gmail.com</a>.
-                            </p>
+    found = re.findall("\x00(\\w+)\x00", rendered)
+    source = env.loader.get_source(env, TEMPLATE_NAME)[0]
+    undeclared = meta.find_undeclared_variables(env.parse(source))
+    if tuple(found) != FIELDS or undeclared - set(FIELDS):
+        raise ValueError(f"{TEMPLATE_NAME} variables do not match FIELDS: {found}")
 
-                            <p style="margin: 0; color: #333333; font-size: 14px;">
-                                Best regards,<br>
-                                <strong>The Premier Hotel Team</strong>
-                            </p>
-                        </td>
-                    </tr>
+    return tuple(re.split("\x00\\w+\x00", rendered))
 
-                    <!-- Footer -->
-                    <tr>
-                        <td style="background-color: #f8f9fa; padding: 30px; text-align: center; border-top: 1px solid #dee2e6;">
-                            <p style="margin: 0 0 10px 0; color: #666666; font-size: 12px;">
-                                © 2025 Premier Hotel. All rights reserved.
-                            </p>
-                            <p style="margin: 0; color: #999999; font-size: 11px;">
-                                This is an automated email. Please do not reply directly to this message.
-                            </p>
-                        </td>
-                    </tr>
-                </table>
-            </td>
-        </tr>
-    </table>
-</body>
-</html>
-    """
+
+def render_values(values: Sequence[Any]) -> str:
+    """Render from values given positionally in FIELDS order"""
+    if len(values) != len(FIELDS):
+        raise TypeError(f"expected {len(FIELDS)} values in FIELDS order, got {len(values)}")
+
+    # Joining the static pieces is a few memcpys; a %-format pattern was ~3x
+    # slower, as % scans the whole 9KB page (bench_email_templates.DEV_ONLY.py)
+    segments = _segments()
+    parts = [segments[0]]
+    for value, segment in zip(values, segments[1:]):
+        parts.append(escape(value))
+        parts.append(segment)
+    return "".join(parts)
+
+
+def render(**context) -> str:
+    """Render the email HTML with the given context"""
+    return render_values([context.get(name, "") for name in FIELDS])
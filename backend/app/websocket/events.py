@@ -1,9 +1,50 @@
 """
 WebSocket Event Handlers and Event Types
 """
-from datetime import datetime, timezone
-from typing import Optional, Dict, Any, List
-from .manager import connection_manager
+import asyncio
+import logging
+from dataclasses import dataclass, replace
+from typing import Awaitable, Optional, Dict, Any, List
+from .manager import connection_manager, MessageTemplate, now_iso
+
+logger = logging.getLogger(__name__)
+
+
+async def _send_all(event_type: str, sends: List[Awaitable[Any]]):
+    """
+    Run an event's sends concurrently. One failing send doesn't stop the
+    others, and each failure is logged rather than dropped.
+    """
+    results = await asyncio.gather(*sends, return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            logger.error(f"Error sending {event_type} event: {str(result)}", exc_info=result)
+
+
+@dataclass(slots=True, frozen=True)
+class OrderEventData:
+    """Payload of order.created events"""
+    order_id: str
+    order_number: str
+    location: str
+    location_type: str
+    items: List[Dict[str, Any]]
+    priority: str
+    special_instructions: Optional[str]
+    estimated_ready_time: Optional[str]
+    customer_id: str
+
+
+@dataclass(slots=True)
+class WSEvent:
+    """
+    An outgoing event. orjson serializes dataclasses natively, so it goes
+    to the wire without first being turned into a dict.
+    """
+    type: str
+    data: Any
+    timestamp: str
+    message: str = ''
 
 
 class WebSocketEvents:
@@ -33,41 +74,58 @@ class WebSocketEvents:
 
     NOTIFICATION = "notification"
 
+    # Customer-friendly order status messages; only the one for the new
+    # status is formatted
+    _STATUS_TEMPLATES = {
+        'confirmed': "Order {order_number} confirmed! Your food is being prepared.",
+        'preparing': "Chef is preparing your order {order_number}",
+        'ready': "Order {order_number} is ready!",
+        'served': "Order {order_number} has been served",
+        'completed': "Order {order_number} completed. Thank you!",
+        'cancelled': "Order {order_number} has been cancelled"
+    }
+
     @staticmethod
     async def emit_order_created(order: Dict[str, Any]):
         """
         Emit event when a new order is created
         Notifies: All chefs, assigned waiter, customer
         """
-        event_data = {
-            'type': WebSocketEvents.ORDER_CREATED,
-            'data': {
-                'order_id': order['id'],
-                'order_number': order['order_number'],
-                'location': order['location'],
-                'location_type': order['location_type'],
-                'items': order['items'],
-                'priority': order['priority'],
-                'special_instructions': order.get('special_instructions'),
-                'estimated_ready_time': order.get('estimated_ready_time'),
-                'customer_id': order['customer_id'],
-            },
-            'timestamp': datetime.now(timezone.utc).isoformat(),
-            'message': f"New order {order['order_number']} from {order['location']}"
-        }
-
-        # Notify all chefs
-        await connection_manager.broadcast_to_role('chef', event_data)
-
-        # Notify customer
-        await connection_manager.send_personal_message(
-            order['customer_id'],
-            {
-                **event_data,
-                'message': f"Your order {order['order_number']} has been placed!"
-            }
+        event_data = WSEvent(
+            type=WebSocketEvents.ORDER_CREATED,
+            data=OrderEventData(
+                order_id=order['id'],
+                order_number=order['order_number'],
+                location=order['location'],
+                location_type=order['location_type'],
+                items=order['items'],
+                priority=order['priority'],
+                special_instructions=order.get('special_instructions'),
+                estimated_ready_time=order.get('estimated_ready_time'),
+                customer_id=order['customer_id'],
+            ),
+            timestamp=now_iso(),
+            message=f"New order {order['order_number']} from {order['location']}"
         )
 
+        sends = [
+            # Notify all chefs and screens subscribed to this location; a chef
+            # who is also subscribed gets the event once
+            connection_manager.broadcast_to_role_and_topic(
+                'chef',
+                f"order.created.loc.{order['location']}",
+                event_data,
+                exclude=order['customer_id']
+            ),
+
+            # Notify customer
+            connection_manager.send_personal_message(
+                order['customer_id'],
+                replace(event_data, message=f"Your order {order['order_number']} has been placed!")
+            ),
+        ]
+        await _send_all(WebSocketEvents.ORDER_CREATED, sends)
+
     @staticmethod
     async def emit_order_status_changed(
         order_id: str,
@@ -92,70 +150,66 @@ class WebSocketEvents:
                 'new_status': new_status,
                 'location': location,
             },
-            'timestamp': datetime.now(timezone.utc).isoformat()
+            'timestamp': now_iso()
         }
 
-        # Customer-friendly messages
-        status_messages = {
-            'confirmed': f"Order {order_number} confirmed! Your food is being prepared.",
-            'preparing': f"Chef is preparing your order {order_number}",
-            'ready': f"Order {order_number} is ready!",
-            'served': f"Order {order_number} has been served",
-            'completed': f"Order {order_number} completed. Thank you!",
-            'cancelled': f"Order {order_number} has been cancelled"
-        }
+        # Sends are collected and awaited together rather than one by one
+        sends = []
+
+        # Serialized once; each recipient's copy only swaps in its message
+        template = MessageTemplate(event_data)
+
+        # Staff get the plain status line; it is also the customer's fallback.
+        # Formatted and rendered once, however many staff are notified.
+        generic_msg = f"Order {order_number} status: {new_status}"
+        staff_message = template.render(generic_msg)
 
         # Notify customer
-        await connection_manager.send_personal_message(
+        customer_template = WebSocketEvents._STATUS_TEMPLATES.get(new_status)
+        sends.append(connection_manager.send_personal_message(
             customer_id,
-            {
-                **event_data,
-                'message': status_messages.get(new_status, f"Order {order_number} status: {new_status}")
-            }
-        )
+            template.render(customer_template.format(order_number=order_number))
+            if customer_template else staff_message
+        ))
 
         # Notify assigned waiter
         if assigned_waiter_id:
-            await connection_manager.send_personal_message(
+            sends.append(connection_manager.send_personal_message(
                 assigned_waiter_id,
-                {
-                    **event_data,
-                    'message': f"Order {order_number} status: {new_status}"
-                }
-            )
+                staff_message
+            ))
 
         # Notify assigned chef
         if assigned_chef_id:
-            await connection_manager.send_personal_message(
+            sends.append(connection_manager.send_personal_message(
                 assigned_chef_id,
-                {
-                    **event_data,
-                    'message': f"Order {order_number} status: {new_status}"
-                }
-            )
+                staff_message
+            ))
 
         # Special notifications based on status
         if new_status == 'ready':
             # Notify all waiters that order is ready for pickup
-            await connection_manager.broadcast_to_role(
+            sends.append(connection_manager.broadcast_to_role(
                 'waiter',
                 {
                     **event_data,
                     'type': WebSocketEvents.ORDER_READY,
                     'message': f"Order {order_number} ready for pickup at {location}"
                 }
-            )
+            ))
 
         elif new_status == 'served':
             # Notify managers about delivered order
-            await connection_manager.broadcast_to_role(
+            sends.append(connection_manager.broadcast_to_role(
                 'manager',
                 {
                     **event_data,
                     'type': WebSocketEvents.ORDER_DELIVERED,
                     'message': f"Order {order_number} delivered to {location}"
                 }
-            )
+            ))
+
+        await _send_all(WebSocketEvents.ORDER_STATUS_CHANGED, sends)
 
     @staticmethod
     async def emit_inventory_low(item_name: str, current_quantity: float, unit: str, reorder_level: float):
@@ -175,16 +229,13 @@ class WebSocketEvents:
                 'reorder_level': reorder_level,
                 'severity': severity
             },
-            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'timestamp': now_iso(),
             'message': f"⚠️ {item_name} is running low: {current_quantity}{unit} (reorder at {reorder_level}{unit})"
         }
 
-        # Notify chefs (they need to know what's running out)
-        await connection_manager.broadcast_to_role('chef', event_data)
-
-        # Notify managers and admin (they need to reorder)
-        await connection_manager.broadcast_to_role('manager', event_data)
-        await connection_manager.broadcast_to_role('admin', event_data)
+        # Notify chefs (they need to know what's running out) and managers
+        # and admin (they need to reorder)
+        await connection_manager.broadcast_to_group('staff_alert', event_data)
 
     @staticmethod
     async def emit_room_status_changed(room_id: str, room_number: str, old_status: str, new_status: str):
@@ -200,15 +251,12 @@ class WebSocketEvents:
                 'old_status': old_status,
                 'new_status': new_status,
             },
-            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'timestamp': now_iso(),
             'message': f"Room {room_number} status changed: {old_status} → {new_status}"
         }
 
-        # Notify cleaners
-        await connection_manager.broadcast_to_role('cleaner', event_data)
-
-        # Notify managers
-        await connection_manager.broadcast_to_role('manager', event_data)
+        # Notify cleaners and managers
+        await connection_manager.broadcast_to_group('housekeeping', event_data)
 
     @staticmethod
     async def emit_cleaning_task_assigned(task_id: str, room_number: str, cleaner_id: str, priority: str):
@@ -223,7 +271,7 @@ class WebSocketEvents:
                 'room_number': room_number,
                 'priority': priority,
             },
-            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'timestamp': now_iso(),
             'message': f"New {priority} priority cleaning task: Room {room_number}"
         }
 
@@ -247,23 +295,24 @@ class WebSocketEvents:
                 'guests': booking.get('guests', 1),
                 'total_amount': booking['total_amount'],
             },
-            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'timestamp': now_iso(),
             'message': f"New booking {booking['booking_reference']} created"
         }
 
-        # Notify managers
-        await connection_manager.broadcast_to_role('manager', event_data)
-        await connection_manager.broadcast_to_role('admin', event_data)
+        # Notify managers and admin
+        sends = [connection_manager.broadcast_to_group('management', event_data)]
 
         # Notify customer
         if booking.get('customer_id'):
-            await connection_manager.send_personal_message(
+            sends.append(connection_manager.send_personal_message(
                 booking['customer_id'],
                 {
                     **event_data,
                     'message': f"Booking confirmed! Reference: {booking['booking_reference']}"
                 }
-            )
+            ))
+
+        await _send_all(WebSocketEvents.BOOKING_CREATED, sends)
 
     @staticmethod
     async def emit_notification(
@@ -284,7 +333,7 @@ class WebSocketEvents:
                 'notification_type': notification_type,  # info, success, warning, error
                 'extra_data': data or {}
             },
-            'timestamp': datetime.now(timezone.utc).isoformat()
+            'timestamp': now_iso()
         }
 
         await connection_manager.send_personal_message(user_id, event_data)
@@ -302,7 +351,7 @@ class WebSocketEvents:
                 'sender_id': sender_id,
                 'content': content,
             },
-            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'timestamp': now_iso(),
             'message': 'New message received'
         }
 
@@ -2,15 +2,63 @@
 WebSocket Connection Manager
 Handles WebSocket connections for real-time updates
 """
-from typing import Dict, Set, List, Optional
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Union
 from fastapi import WebSocket
+from starlette.websockets import WebSocketState
 from dataclasses import dataclass, field
+import asyncio
+import collections
+import concurrent.futures
 import json
 import logging
+import orjson
+import time
+import weakref
 from datetime import datetime, timezone
+from app.services.websocket_manager import batch_frame, now_iso
+from .topics import TopicTrie
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on socket writes in flight at once across all connections
+MAX_CONCURRENT_SENDS = 256
+
+# Messages queued for a connection within this window go out as one frame
+FLUSH_INTERVAL = 0.02
+
+# Most messages a connection may have queued; past this the oldest are dropped
+OUTBOX_SIZE = 256
+
+# Broadcasts are logged individually at DEBUG only; at INFO they are
+# summarized at most once per this many seconds
+BROADCAST_SUMMARY_INTERVAL = 5.0
+
+# Broadcasts whose data carries more items than this are serialized on a
+# worker thread instead of on the event loop
+OFFLOAD_SERIALIZE_ITEMS = 5
+
+
+def _event_field(event: Any, name: str) -> Any:
+    """A field of an event, whether it is a dict or an event dataclass"""
+    if isinstance(event, dict):
+        return event.get(name)
+    return getattr(event, name, None)
+
+
+# One bit per role, for the set of roles that have anyone connected
+ROLE_BITS = {
+    role: 1 << i
+    for i, role in enumerate(['chef', 'waiter', 'cleaner', 'manager', 'admin', 'customer'])
+}
+
+# Sets of roles that events are always sent to together
+ROLE_GROUPS = {
+    'staff': ('chef', 'waiter', 'manager', 'admin'),
+    'staff_alert': ('chef', 'manager', 'admin'),
+    'management': ('manager', 'admin'),
+    'housekeeping': ('cleaner', 'manager'),
+}
+
 
 @dataclass
 class Connection:
@@ -19,6 +67,37 @@ class Connection:
     user_id: str
     role: str
     connected_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    # Serialized messages waiting to be written by the writer task; once
+    # full, appending drops the oldest
+    outbox: collections.deque = field(default_factory=lambda: collections.deque(maxlen=OUTBOX_SIZE))
+    # Set while the outbox has messages, to wake the writer
+    ready: asyncio.Event = field(default_factory=asyncio.Event)
+    writer: Optional[asyncio.Task] = None
+    # Messages dropped because the client wasn't keeping up
+    dropped: int = 0
+
+
+# Stand-in for a per-recipient 'message', and how orjson serializes it
+_MESSAGE_SLOT = "\x00message\x00"
+_MESSAGE_SLOT_JSON = '"\\u0000message\\u0000"'
+
+
+class MessageTemplate:
+    """
+    An event serialized once with its 'message' left open. Per-recipient
+    variants are then a string splice instead of a dict copy plus a full
+    serialization each; pass render()'s result to send_personal_message.
+    """
+
+    def __init__(self, event: dict):
+        # 'message' goes last, so the slot is the final match in the JSON
+        event = {key: value for key, value in event.items() if key != 'message'}
+        event['message'] = _MESSAGE_SLOT
+        self._head, _, self._tail = ConnectionManager._prepare(event).rpartition(_MESSAGE_SLOT_JSON)
+
+    def render(self, message: str) -> str:
+        """The serialized event with the given message filled in"""
+        return self._head + orjson.dumps(message).decode() + self._tail
 
 
 class ConnectionManager:
@@ -32,19 +111,56 @@ class ConnectionManager:
     """
 
     def __init__(self):
-        # All active connections
-        self.active_connections: Dict[str, Connection] = {}
-
-        # Connections grouped by role for efficient role-based broadcasting
-        self.role_connections: Dict[str, Set[str]] = {
-            'chef': set(),
-            'waiter': set(),
-            'cleaner': set(),
-            'manager': set(),
-            'admin': set(),
-            'customer': set()
+        # All active connections. Held weakly: a connection lives as long as
+        # its writer task, so one whose writer has ended drops out (and out of
+        # role_connections, see _forget) even if disconnect was never called.
+        self.active_connections: "weakref.WeakValueDictionary[str, Connection]" = weakref.WeakValueDictionary()
+
+        # Running writer tasks; the loop only keeps weak references to tasks,
+        # so these are what keep writers, and their connections, alive
+        self._writers: Set[asyncio.Task] = set()
+
+        # Connections grouped by role for efficient role-based broadcasting.
+        # The sets are replaced rather than mutated on connect/disconnect, so
+        # a broadcast can iterate the current one without copying it.
+        self.role_connections: Dict[str, FrozenSet[str]] = {
+            'chef': frozenset(),
+            'waiter': frozenset(),
+            'cleaner': frozenset(),
+            'manager': frozenset(),
+            'admin': frozenset(),
+            'customer': frozenset()
         }
 
+        # Bitmask of roles with at least one connection (see ROLE_BITS), so
+        # broadcasts to a role nobody is connected as return straight away
+        self._nonempty_roles = 0
+
+        # Members of each ROLE_GROUPS group, built on first use and dropped
+        # whenever role membership changes
+        self._group_connections: Dict[str, FrozenSet[str]] = {}
+
+        # Subscriptions to hierarchical topics (e.g. order.created.loc.T-10),
+        # for clients that want more targeted events than their role gets
+        self.topics = TopicTrie()
+
+        # Serializes large broadcast payloads off the event loop
+        self._serialize_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="ws-serialize"
+        )
+
+        # Broadcasts since the last INFO summary (see _log_broadcast)
+        self._broadcast_count = 0
+        self._broadcast_recipients = 0
+        self._broadcast_last_log = time.monotonic()
+
+        # Connections whose writer failed, disconnected together on the next
+        # loop iteration so a burst of dead sockets is cleaned up in one pass
+        self._failed_connections: List[Connection] = []
+
+        # Bounds concurrent socket writes
+        self._send_semaphore = asyncio.Semaphore(MAX_CONCURRENT_SENDS)
+
     async def connect(self, websocket: WebSocket, user_id: str, role: str):
         """Accept and register a new WebSocket connection"""
         await websocket.accept()
@@ -56,12 +172,24 @@ class ConnectionManager:
             role=role
         )
 
-        # Store connection
+        # Store connection, replacing any previous one for this user
+        previous = self.active_connections.get(user_id)
+        if previous is not None:
+            if previous.writer is not None:
+                previous.writer.cancel()
+            if previous.role != role and previous.role in self.role_connections:
+                self.role_connections[previous.role] = self.role_connections[previous.role] - {user_id}
+                self._update_role_bit(previous.role)
         self.active_connections[user_id] = connection
+        connection.writer = asyncio.create_task(self._writer_loop(connection))
+        self._writers.add(connection.writer)
+        connection.writer.add_done_callback(self._writers.discard)
+        weakref.finalize(connection, self._forget, user_id, role)
 
         # Add to role group
         if role in self.role_connections:
-            self.role_connections[role].add(user_id)
+            self.role_connections[role] = self.role_connections[role] | {user_id}
+            self._update_role_bit(role)
 
         logger.info(f"WebSocket connected: user={user_id}, role={role}")
 
@@ -71,61 +199,288 @@ class ConnectionManager:
             {
                 'type': 'connection.established',
                 'message': 'Connected to Premier Hotel real-time updates',
-                'timestamp': datetime.now(timezone.utc).isoformat()
+                'timestamp': now_iso()
             }
         )
 
     def disconnect(self, user_id: str):
         """Remove a WebSocket connection"""
+        self._bulk_disconnect([user_id])
+
+    def _bulk_disconnect(self, user_ids: Iterable[str]):
+        """
+        Remove several WebSocket connections at once. Each affected role set
+        is rebuilt once, not once per user, and one line is logged for the lot.
+        """
+        removed: Dict[str, set] = {}
+        disconnected: List[str] = []
+        for user_id in user_ids:
+            connection = self.active_connections.pop(user_id, None)
+            if connection is None:
+                continue
+            removed.setdefault(connection.role, set()).add(user_id)
+            disconnected.append(user_id)
+            self.topics.unsubscribe(user_id)
+
+            # Stop the writer, unless it is the one disconnecting us
+            if connection.writer is not None and connection.writer is not asyncio.current_task():
+                connection.writer.cancel()
+
+        # Remove from role groups
+        for role, role_user_ids in removed.items():
+            if role in self.role_connections:
+                self.role_connections[role] = self.role_connections[role] - role_user_ids
+                self._update_role_bit(role)
+
+        if len(disconnected) == 1:
+            logger.info(f"WebSocket disconnected: user={disconnected[0]}")
+        elif disconnected:
+            logger.info(f"WebSocket disconnected {len(disconnected)} users: {', '.join(disconnected)}")
+
+    def _forget(self, user_id: str, role: str):
+        """
+        Clean up after a connection that was garbage collected without being
+        disconnected, unless the user has since reconnected
+        """
         if user_id in self.active_connections:
-            connection = self.active_connections[user_id]
+            return
+        if user_id in self.role_connections.get(role, ()):
+            self.role_connections[role] = self.role_connections[role] - {user_id}
+            self._update_role_bit(role)
+        self.topics.unsubscribe(user_id)
+
+    def _disconnect_failed(self):
+        """Disconnect every connection whose writer failed since the last call"""
+        failed, self._failed_connections = self._failed_connections, []
+        self._bulk_disconnect(
+            connection.user_id for connection in failed
+            if self.active_connections.get(connection.user_id) is connection
+        )
 
-            # Remove from role group
-            if connection.role in self.role_connections:
-                self.role_connections[connection.role].discard(user_id)
+    def _update_role_bit(self, role: str):
+        """
+        Set or clear the role's bit in _nonempty_roles from its membership,
+        and drop the cached groups since one of their roles has changed
+        """
+        self._group_connections.clear()
+        if self.role_connections[role]:
+            self._nonempty_roles |= ROLE_BITS[role]
+        else:
+            self._nonempty_roles &= ~ROLE_BITS[role]
+
+    @staticmethod
+    def _prepare(message: Any) -> str:
+        """
+        Serialize a message (a dict or an event dataclass) for the wire;
+        datetimes and dataclasses are handled by orjson
+        """
+        return orjson.dumps(message, option=orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS).decode()
+
+    async def _prepare_async(self, message: Any) -> str:
+        """
+        _prepare, run on the serialization pool for large payloads (e.g. an
+        order with many items) so they don't stall other connections; small
+        ones are cheaper to serialize inline than to hand off
+        """
+        data = _event_field(message, 'data')
+        items = _event_field(data, 'items') if data is not None else None
+        if isinstance(items, list) and len(items) > OFFLOAD_SERIALIZE_ITEMS:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._serialize_pool, self._prepare, message)
+        return self._prepare(message)
+
+    async def send_personal_message(self, user_id: str, message: Union[dict, str, Any]):
+        """
+        Send a message to a specific user. Accepts a message dict, an event
+        dataclass, or a string already serialized (e.g. by MessageTemplate.render).
+        """
+        connection = self.active_connections.get(user_id)
+        if connection is not None:
+            payload = message if isinstance(message, str) else self._prepare(message)
+            self._enqueue(connection, payload)
+
+    async def _fan_out(self, user_ids: Iterable[str], message: Any):
+        """
+        Queue a message for many users. It is serialized once, not once per
+        recipient, and each connection's writer delivers it concurrently, so
+        one slow socket doesn't hold up everyone else.
+        """
+        payload = await self._prepare_async(message)
+        for user_id in user_ids:
+            connection = self.active_connections.get(user_id)
+            if connection is not None:
+                self._enqueue(connection, payload)
+
+    def _enqueue(self, connection: Connection, payload: str):
+        """
+        Queue a serialized message without waiting. If a slow client has let
+        its outbox fill up, the oldest message is dropped to make room, so
+        memory stays bounded and producers never block on one client.
+        """
+        if not self._is_open(connection):
+            self._mark_failed(connection)
+            return
 
-            # Remove from active connections
-            del self.active_connections[user_id]
+        outbox = connection.outbox
+        if len(outbox) == OUTBOX_SIZE:
+            connection.dropped += 1
+            if connection.dropped == 1 or connection.dropped % OUTBOX_SIZE == 0:
+                logger.warning(
+                    f"WebSocket outbox full for user={connection.user_id}: "
+                    f"{connection.dropped} messages dropped"
+                )
+        outbox.append(payload)
+        connection.ready.set()
+
+    async def _writer_loop(self, connection: Connection):
+        """
+        Write a connection's queued messages. Messages arriving within
+        FLUSH_INTERVAL of each other are sent as one frame, in the same format
+        as the live manager (see batch_frame).
+        """
+        outbox = connection.outbox
+        ready = connection.ready
+        try:
+            while True:
+                await ready.wait()
+                await asyncio.sleep(FLUSH_INTERVAL)
+                batch = list(outbox)
+                outbox.clear()
+                ready.clear()
+
+                if not self._is_open(connection):
+                    self._mark_failed(connection)
+                    return
+
+                async with self._send_semaphore:
+                    await connection.websocket.send_text(batch_frame(batch))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Sockets that closed cleanly are caught by _is_open above; this is
+            # for ones that died mid-send
+            logger.error(f"Error sending message to {connection.user_id}: {str(e)}")
+            self._mark_failed(connection)
+
+    @staticmethod
+    def _is_open(connection: Connection) -> bool:
+        """Whether the socket is still connected, checked without sending to it"""
+        websocket = connection.websocket
+        return (
+            websocket.application_state == WebSocketState.CONNECTED
+            and websocket.client_state == WebSocketState.CONNECTED
+        )
 
-            logger.info(f"WebSocket disconnected: user={user_id}")
+    def _mark_failed(self, connection: Connection):
+        """Queue a dead connection to be disconnected on the next loop iteration"""
+        self._failed_connections.append(connection)
+        if len(self._failed_connections) == 1:
+            asyncio.get_running_loop().call_soon(self._disconnect_failed)
 
-    async def send_personal_message(self, user_id: str, message: dict):
-        """Send a message to a specific user"""
-        if user_id in self.active_connections:
-            connection = self.active_connections[user_id]
-            try:
-                await connection.websocket.send_json(message)
-            except Exception as e:
-                logger.error(f"Error sending message to {user_id}: {str(e)}")
-                self.disconnect(user_id)
-
-    async def broadcast_to_role(self, role: str, message: dict):
+    async def broadcast_to_role(self, role: str, message: Any):
         """Send a message to all users with a specific role"""
-        if role not in self.role_connections:
+        bit = ROLE_BITS.get(role)
+        if bit is None:
             logger.warning(f"Unknown role: {role}")
             return
+        if not self._nonempty_roles & bit:
+            return
 
-        user_ids = list(self.role_connections[role])
+        user_ids = self.role_connections[role]
+
+        self._log_broadcast(f"{role}s", len(user_ids), message)
+
+        await self._fan_out(user_ids, message)
+
+    def _log_broadcast(self, target: str, recipients: int, message: Any):
+        """
+        Log a broadcast at DEBUG, and every BROADCAST_SUMMARY_INTERVAL seconds
+        log one INFO line totalling the broadcasts since the last one
+        """
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Broadcasting to {recipients} {target}: {_event_field(message, 'type')}")
+
+        self._broadcast_count += 1
+        self._broadcast_recipients += recipients
+        now = time.monotonic()
+        elapsed = now - self._broadcast_last_log
+        if elapsed >= BROADCAST_SUMMARY_INTERVAL:
+            logger.info(
+                f"Sent {self._broadcast_count} broadcasts to {self._broadcast_recipients} "
+                f"recipients in the last {elapsed:.0f}s"
+            )
+            self._broadcast_count = 0
+            self._broadcast_recipients = 0
+            self._broadcast_last_log = now
+
+    def subscribe(self, user_id: str, topic: str):
+        """Subscribe a connected user to a topic and everything under it"""
+        if user_id in self.active_connections:
+            self.topics.subscribe(topic, user_id)
 
-        logger.info(f"Broadcasting to {len(user_ids)} {role}s: {message.get('type')}")
+    def unsubscribe(self, user_id: str, topic: Optional[str] = None):
+        """Remove one topic subscription for a user, or all of them"""
+        self.topics.unsubscribe(user_id, topic)
 
-        for user_id in user_ids:
-            await self.send_personal_message(user_id, message)
+    async def publish(self, topic: str, message: Any):
+        """Send a message to every user subscribed to the topic or a prefix of it"""
+        if not len(self.topics):
+            return
+        await self._fan_out(self.topics.match(topic), message)
+
+    async def broadcast_to_role_and_topic(
+        self,
+        role: str,
+        topic: str,
+        message: Any,
+        exclude: Optional[str] = None
+    ):
+        """
+        Send a message to everyone with a role and everyone subscribed to a
+        topic, once per user even if they are both. `exclude` skips one user,
+        e.g. a customer who is sent their own copy.
+        """
+        user_ids = set(self.role_connections.get(role, ()))
+        if len(self.topics):
+            user_ids.update(self.topics.match(topic))
+        user_ids.discard(exclude)
+
+        self._log_broadcast(f"{role}s and {topic} subscribers", len(user_ids), message)
+
+        await self._fan_out(user_ids, message)
+
+    async def broadcast_to_group(self, group: str, message: Any):
+        """
+        Send a message to everyone in a ROLE_GROUPS group as one fan-out,
+        rather than one broadcast_to_role per role
+        """
+        roles = ROLE_GROUPS.get(group)
+        if roles is None:
+            logger.warning(f"Unknown role group: {group}")
+            return
+        if not any(self._nonempty_roles & ROLE_BITS[role] for role in roles):
+            return
+
+        user_ids = self._group_connections.get(group)
+        if user_ids is None:
+            user_ids = frozenset().union(*(self.role_connections[role] for role in roles))
+            self._group_connections[group] = user_ids
+
+        self._log_broadcast(f"{group} users", len(user_ids), message)
 
-    async def broadcast_to_staff(self, message: dict):
+        await self._fan_out(user_ids, message)
+
+    async def broadcast_to_staff(self, message: Any):
         """Send a message to all staff members (chef, waiter, manager, admin)"""
-        staff_roles = ['chef', 'waiter', 'manager', 'admin']
-        for role in staff_roles:
-            await self.broadcast_to_role(role, message)
+        await self.broadcast_to_group('staff', message)
 
-    async def broadcast_to_all(self, message: dict):
+    async def broadcast_to_all(self, message: Any):
         """Send a message to all connected users"""
         user_ids = list(self.active_connections.keys())
 
-        logger.info(f"Broadcasting to all {len(user_ids)} users: {message.get('type')}")
+        self._log_broadcast("users (all)", len(user_ids), message)
 
-        for user_id in user_ids:
-            await self.send_personal_message(user_id, message)
+        await self._fan_out(user_ids, message)
 
     def get_connection_count(self) -> int:
         """Get total number of active connections"""
@@ -133,7 +488,7 @@ class ConnectionManager:
 
     def get_role_connection_count(self, role: str) -> int:
         """Get number of connections for a specific role"""
-        return len(self.role_connections.get(role, set()))
+        return len(self.role_connections.get(role, frozenset()))
 
     def get_connection_stats(self) -> dict:
         """Get statistics about current connections"""
@@ -0,0 +1,84 @@
+"""
+Topic subscriptions for WebSocket fan-out
+Hierarchical, dot-separated topics (e.g. order.created.loc.T-10) stored in a trie
+"""
+from typing import Dict, Iterator, Set
+
+
+class _Node:
+    """A trie node: one topic segment"""
+    __slots__ = ('children', 'subscribers')
+
+    def __init__(self):
+        self.children: Dict[str, '_Node'] = {}
+        self.subscribers: Set[str] = set()
+
+
+class TopicTrie:
+    """
+    Subscriptions keyed on dot-separated topic prefixes
+
+    A user subscribed to "order.created" matches every topic under it
+    ("order.created.loc.T-10", ...), while one subscribed to
+    "order.created.loc.T-10" only matches that location. Matching walks one
+    node per topic segment, however many subscriptions there are.
+    """
+
+    def __init__(self):
+        self._root = _Node()
+        # Patterns per user, so unsubscribe doesn't search the whole trie
+        self._patterns: Dict[str, Set[str]] = {}
+
+    def subscribe(self, pattern: str, user_id: str):
+        """Subscribe a user to a topic and everything under it"""
+        node = self._root
+        for segment in pattern.split('.'):
+            node = node.children.setdefault(segment, _Node())
+        node.subscribers.add(user_id)
+        self._patterns.setdefault(user_id, set()).add(pattern)
+
+    def unsubscribe(self, user_id: str, pattern: str = None):
+        """Remove one subscription for a user, or all of them"""
+        patterns = self._patterns.get(user_id)
+        if not patterns:
+            return
+
+        for p in ([pattern] if pattern else list(patterns)):
+            if p in patterns:
+                self._remove(p, user_id)
+                patterns.discard(p)
+        if not patterns:
+            del self._patterns[user_id]
+
+    def _remove(self, pattern: str, user_id: str):
+        """Drop a subscriber and prune nodes left empty"""
+        path = [self._root]
+        segments = pattern.split('.')
+        for segment in segments:
+            node = path[-1].children.get(segment)
+            if node is None:
+                return
+            path.append(node)
+
+        path[-1].subscribers.discard(user_id)
+        for segment, node, parent in zip(reversed(segments), reversed(path[1:]), reversed(path[:-1])):
+            if node.subscribers or node.children:
+                break
+            del parent.children[segment]
+
+    def match(self, topic: str) -> Iterator[str]:
+        """Users subscribed to the topic or any prefix of it, each once"""
+        seen: Set[str] = set()
+        node = self._root
+        for segment in topic.split('.'):
+            node = node.children.get(segment)
+            if node is None:
+                break
+            for user_id in node.subscribers:
+                if user_id not in seen:
+                    seen.add(user_id)
+                    yield user_id
+
+    def __len__(self) -> int:
+        """Number of users with at least one subscription"""
+        return len(self._patterns)
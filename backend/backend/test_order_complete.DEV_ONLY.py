@@ -2,12 +2,20 @@
 """
 Complete order flow test - Register user, get menu, create order with customer info
 """
+import asyncio
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import time
 
 API_URL = "http://localhost:8000/api/v1"
 
+# One session for the whole run, so every call reuses a keep-alive connection
+session = requests.Session()
+session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
 print("🧪 Complete Order Flow Test with Customer Information\n")
 print("="*70)
 
@@ -24,7 +32,7 @@ register_data = {
     "phone": phone
 }
 
-response = requests.post(f"{API_URL}/auth/register", json=register_data)
+response = session.post(f"{API_URL}/auth/register", json=register_data)
 if response.status_code in [200, 201]:
     user_data = response.json()
     access_token = user_data.get("access_token")
@@ -34,14 +42,14 @@ else:
     print(f"   {response.text}")
     exit(1)
 
-headers = {
+session.headers.update({
     "Authorization": f"Bearer {access_token}",
     "Content-Type": "application/json"
-}
+})
 
 # Step 2: Get actual menu items
 print("\n2️⃣ Fetching menu items from database...")
-response = requests.get(f"{API_URL}/menu/items", headers=headers)
+response = session.get(f"{API_URL}/menu/items")
 
 if response.status_code == 200:
     menu_items = response.json()
@@ -67,7 +75,7 @@ if response.status_code == 200:
             "customizations": []
         }
 
-        create_response = requests.post(f"{API_URL}/menu/items", json=menu_item_data, headers=headers)
+        create_response = session.post(f"{API_URL}/menu/items", json=menu_item_data)
         if create_response.status_code in [200, 201]:
             item = create_response.json()
             print(f"   ✅ Created menu item: {item['name']} (ID: {item['id']})")
@@ -119,12 +127,13 @@ test_scenarios = [
     }
 ]
 
-successful_orders = 0
 
-for i, scenario in enumerate(test_scenarios, 1):
-    print(f"\n{'='*70}")
-    print(f"3.{i} Testing: {scenario['name']}")
-    print(f"{'='*70}")
+async def run_scenario(client, i, scenario):
+    """Create and verify one order; output is collected and returned, not printed"""
+    out = []
+    out.append(f"\n{'='*70}")
+    out.append(f"3.{i} Testing: {scenario['name']}")
+    out.append(f"{'='*70}")
 
     order_data = {
         "location": scenario['location'],
@@ -145,40 +154,59 @@ for i, scenario in enumerate(test_scenarios, 1):
         "payment_method": scenario['payment_method']
     }
 
-    print(f"   📋 Customer: {order_data['customer_name']}")
-    print(f"   📋 Phone: {order_data['customer_phone']}")
-    print(f"   📋 Type: {order_data['order_type']}")
-    print(f"   📋 Payment: {order_data['payment_method']}")
-    print(f"   📋 Location: {order_data['location']}")
-
-    response = requests.post(f"{API_URL}/orders", json=order_data, headers=headers)
-
-    if response.status_code == 201:
-        order = response.json()
-        successful_orders += 1
-        print(f"\n   ✅ Order Created!")
-        print(f"      Order #: {order['order_number']}")
-        print(f"      Total: KES {order['total_amount']}")
-
-        # Verify fields
-        order_id = order['id']
-        verify = requests.get(f"{API_URL}/orders/{order_id}", headers=headers)
-
-        if verify.status_code == 200:
-            details = verify.json()
-            print(f"\n   🔍 Verification:")
-            print(f"      ✅ Customer Name: {details.get('customer_name', '❌')}")
-            print(f"      ✅ Phone: {details.get('customer_phone', '❌')}")
-            print(f"      ✅ Order Type: {details.get('order_type', '❌')}")
-            print(f"      ✅ Payment: {details.get('payment_method', '❌')}")
-
-            if scenario['order_type'] == 'room_service':
-                print(f"      ✅ Room: {details.get('room_number', '❌')}")
-            elif scenario['order_type'] == 'dine_in':
-                print(f"      ✅ Table: {details.get('table_number', '❌')}")
-    else:
-        print(f"\n   ❌ Failed: {response.status_code}")
-        print(f"   {response.text}")
+    out.append(f"   📋 Customer: {order_data['customer_name']}")
+    out.append(f"   📋 Phone: {order_data['customer_phone']}")
+    out.append(f"   📋 Type: {order_data['order_type']}")
+    out.append(f"   📋 Payment: {order_data['payment_method']}")
+    out.append(f"   📋 Location: {order_data['location']}")
+
+    response = await client.post("/orders/", json=order_data)
+
+    if response.status_code != 201:
+        out.append(f"\n   ❌ Failed: {response.status_code}")
+        out.append(f"   {response.text}")
+        return False, out
+
+    order = response.json()
+    out.append(f"\n   ✅ Order Created!")
+    out.append(f"      Order #: {order['order_number']}")
+    out.append(f"      Total: KES {order['total_amount']}")
+
+    # Verify fields
+    order_id = order['id']
+    verify = await client.get(f"/orders/{order_id}")
+
+    if verify.status_code == 200:
+        details = verify.json()
+        out.append(f"\n   🔍 Verification:")
+        out.append(f"      ✅ Customer Name: {details.get('customer_name', '❌')}")
+        out.append(f"      ✅ Phone: {details.get('customer_phone', '❌')}")
+        out.append(f"      ✅ Order Type: {details.get('order_type', '❌')}")
+        out.append(f"      ✅ Payment: {details.get('payment_method', '❌')}")
+
+        if scenario['order_type'] == 'room_service':
+            out.append(f"      ✅ Room: {details.get('room_number', '❌')}")
+        elif scenario['order_type'] == 'dine_in':
+            out.append(f"      ✅ Table: {details.get('table_number', '❌')}")
+
+    return True, out
+
+
+async def run_all():
+    """Run every scenario concurrently; they are independent once we're logged in"""
+    async with httpx.AsyncClient(base_url=API_URL, headers=dict(session.headers)) as client:
+        return await asyncio.gather(
+            *(run_scenario(client, i, scenario) for i, scenario in enumerate(test_scenarios, 1))
+        )
+
+
+results = asyncio.run(run_all())
+
+# Print each scenario's output in order, so concurrent runs don't interleave
+for _, out in results:
+    print("\n".join(out))
+
+successful_orders = sum(1 for ok, _ in results if ok)
 
 # Summary
 print(f"\n{'='*70}")
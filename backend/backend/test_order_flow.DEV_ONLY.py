@@ -4,7 +4,13 @@ Test the complete order flow with customer information and payment method
 """
 import sys
 import os
+import json
+import time
+import asyncio
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
 
 # Add backend to path
@@ -12,6 +18,203 @@ sys.path.insert(0, os.path.dirname(__file__))
 
 API_URL = "http://localhost:8000/api/v1"
 
+# One session for the whole run, so every call reuses a keep-alive connection.
+# Idempotent requests are retried on a transient 5xx instead of failing the run.
+session = requests.Session()
+session.mount("http://", HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=10,
+    max_retries=Retry(total=2, status_forcelist=[502, 503, 504])
+))
+
+# Access tokens from earlier runs, keyed by email, so repeat runs skip the login
+AUTH_CACHE = os.path.expanduser("~/.premier_test_auth.json")
+
+
+def _get_cached_token(email, password, ttl=300, refresh=False):
+    """
+    Access token for the account. Reuses the one cached by an earlier run if
+    it is under ttl seconds old (tokens last 30 minutes); otherwise, or with
+    refresh=True, logs in and caches the new one.
+    """
+    try:
+        with open(AUTH_CACHE) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+
+    entry = cache.get(email)
+    if entry and not refresh and time.time() - entry["ts"] < ttl:
+        return entry["token"]
+
+    response = session.post(f"{API_URL}/auth/login", json={"email": email, "password": password})
+    response.raise_for_status()
+    token = response.json().get("access_token")
+
+    cache[email] = {"token": token, "ts": time.time()}
+    with open(AUTH_CACHE, "w") as f:
+        json.dump(cache, f)
+    os.chmod(AUTH_CACHE, 0o600)
+    return token
+
+
+# Order scenarios. The menu item is only known once the menu has been
+# fetched, so _with_item fills it in at run time.
+_SCENARIO_TEMPLATES = [
+    {
+        "name": "Dine-In Order with Cash Payment",
+        "data": {
+            "location": "T-12",
+            "location_type": "table",
+            "items": [
+                {
+                    "quantity": 2,
+                    "customizations": {},
+                    "special_instructions": "Extra sauce please"
+                }
+            ],
+            "special_instructions": "Customer prefers window seat",
+            "customer_name": "John Doe",
+            "customer_phone": "+254712345678",
+            "order_type": "dine_in",
+            "payment_method": "cash"
+        }
+    },
+    {
+        "name": "Room Service with Room Charge",
+        "data": {
+            "location": "305",
+            "location_type": "room",
+            "items": [
+                {
+                    "quantity": 1,
+                    "customizations": {},
+                    "special_instructions": "No onions"
+                }
+            ],
+            "special_instructions": "Deliver to room 305",
+            "customer_name": "Jane Smith",
+            "customer_phone": "+254722345678",
+            "order_type": "room_service",
+            "payment_method": "room_charge"
+        }
+    },
+    {
+        "name": "Takeaway with M-Pesa",
+        "data": {
+            "location": "Takeaway",
+            "location_type": "table",
+            "items": [
+                {
+                    "quantity": 3,
+                    "customizations": {},
+                    "special_instructions": ""
+                }
+            ],
+            "special_instructions": "",
+            "customer_name": "Bob Johnson",
+            "customer_phone": "+254733456789",
+            "order_type": "walk_in",
+            "payment_method": "mpesa"
+        }
+    },
+    {
+        "name": "Dine-In with Card Payment",
+        "data": {
+            "location": "T-05",
+            "location_type": "table",
+            "items": [
+                {
+                    "quantity": 2,
+                    "customizations": {},
+                    "special_instructions": ""
+                }
+            ],
+            "special_instructions": "",
+            "customer_name": "Alice Brown",
+            "customer_phone": "+254744567890",
+            "order_type": "dine_in",
+            "payment_method": "card"
+        }
+    }
+]
+
+
+def _with_item(scenario, item_id):
+    """A copy of a scenario template ordering the given menu item"""
+    data = scenario["data"]
+    return {
+        **scenario,
+        "data": {**data, "items": [{"menu_item_id": item_id, **data["items"][0]}]}
+    }
+
+
+async def _run_scenario(client, i, scenario, first_item):
+    """
+    Create one scenario's order and check its saved fields. Returns the created order
+    (or None) and the lines to print, so concurrent scenarios don't interleave.
+    """
+    out = []
+    out.append(f"\n{'='*70}")
+    out.append(f"3️⃣.{i} Testing: {scenario['name']}")
+    out.append(f"{'='*70}")
+
+    order_data = scenario['data']
+
+    out.append(f"   📝 Order Details:")
+    out.append(f"      Customer: {order_data['customer_name']}")
+    out.append(f"      Phone: {order_data['customer_phone']}")
+    out.append(f"      Type: {order_data['order_type']}")
+    out.append(f"      Payment: {order_data['payment_method']}")
+    out.append(f"      Location: {order_data['location']} ({order_data['location_type']})")
+    out.append(f"      Items: {order_data['items'][0]['quantity']} x {first_item['name']}")
+
+    created_order = None
+    try:
+        response = await client.post("/orders/", json=order_data)
+        if response.status_code == 201:
+            created_order = response.json()
+
+            out.append(f"\n   ✅ Order created successfully!")
+            out.append(f"      Order Number: {created_order['order_number']}")
+            out.append(f"      Total Amount: KES {created_order['total_amount']}")
+            out.append(f"      Status: {created_order['status']}")
+
+            # Verify customer fields. The create response is the saved row,
+            # so there's no need to read it back with another request.
+            order_details = created_order
+            out.append(f"\n   🔍 Verifying saved fields:")
+            out.append(f"      ✅ Customer Name: {order_details.get('customer_name', 'NOT SET')}")
+            out.append(f"      ✅ Customer Phone: {order_details.get('customer_phone', 'NOT SET')}")
+            out.append(f"      ✅ Order Type: {order_details.get('order_type', 'NOT SET')}")
+            out.append(f"      ✅ Payment Method: {order_details.get('payment_method', 'NOT SET')}")
+            out.append(f"      ✅ Created By Staff: {order_details.get('created_by_staff_id', 'NOT SET')}")
+
+            if order_data['order_type'] == 'room_service':
+                out.append(f"      ✅ Room Number: {order_details.get('room_number', 'NOT SET')}")
+            elif order_data['order_type'] == 'dine_in':
+                out.append(f"      ✅ Table Number: {order_details.get('table_number', 'NOT SET')}")
+        else:
+            out.append(f"   ❌ Order creation failed: {response.status_code}")
+            out.append(f"   Response: {response.text}")
+    except Exception as e:
+        out.append(f"   ❌ Error: {e}")
+
+    return created_order, out
+
+
+async def _run_all(scenarios, first_item):
+    """Run every scenario at once on one async client with the session's auth headers"""
+    async with httpx.AsyncClient(
+        base_url=API_URL,
+        headers=dict(session.headers),
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+    ) as client:
+        return await asyncio.gather(
+            *(_run_scenario(client, i, scenario, first_item) for i, scenario in enumerate(scenarios, 1))
+        )
+
+
 def test_complete_order_flow():
     """Test creating orders with all customer information and payment methods"""
 
@@ -26,29 +229,32 @@ def test_complete_order_flow():
     }
 
     try:
-        response = requests.post(f"{API_URL}/auth/login", json=login_data)
-        if response.status_code == 200:
-            token_data = response.json()
-            access_token = token_data.get("access_token")
-            print(f"   ✅ Login successful!")
-            print(f"   Token: {access_token[:50]}...")
-        else:
-            print(f"   ❌ Login failed: {response.status_code}")
-            print(f"   Response: {response.text}")
-            return
+        access_token = _get_cached_token(login_data["email"], login_data["password"])
+        print(f"   ✅ Login successful!")
+        print(f"   Token: {access_token[:50]}...")
+    except requests.HTTPError as e:
+        print(f"   ❌ Login failed: {e.response.status_code}")
+        print(f"   Response: {e.response.text}")
+        return
     except Exception as e:
         print(f"   ❌ Error: {e}")
         return
 
-    headers = {
+    session.headers.update({
         "Authorization": f"Bearer {access_token}",
         "Content-Type": "application/json"
-    }
+    })
 
     # Step 2: Get menu items
     print("\n2️⃣ Fetching menu items...")
     try:
-        response = requests.get(f"{API_URL}/menu/items", headers=headers)
+        response = session.get(f"{API_URL}/menu/items")
+        if response.status_code == 401:
+            # The cached token was revoked or has expired; log in again once
+            print("   ℹ️  Cached token rejected, logging in again...")
+            access_token = _get_cached_token(login_data["email"], login_data["password"], refresh=True)
+            session.headers["Authorization"] = f"Bearer {access_token}"
+            response = session.get(f"{API_URL}/menu/items")
         if response.status_code == 200:
             menu_items = response.json()
             print(f"   ✅ Found {len(menu_items)} menu items")
@@ -65,138 +271,17 @@ def test_complete_order_flow():
         return
 
     # Step 3: Test different order scenarios
-    test_scenarios = [
-        {
-            "name": "Dine-In Order with Cash Payment",
-            "data": {
-                "location": "T-12",
-                "location_type": "table",
-                "items": [
-                    {
-                        "menu_item_id": first_item["id"],
-                        "quantity": 2,
-                        "customizations": {},
-                        "special_instructions": "Extra sauce please"
-                    }
-                ],
-                "special_instructions": "Customer prefers window seat",
-                "customer_name": "John Doe",
-                "customer_phone": "+254712345678",
-                "order_type": "dine_in",
-                "payment_method": "cash"
-            }
-        },
-        {
-            "name": "Room Service with Room Charge",
-            "data": {
-                "location": "305",
-                "location_type": "room",
-                "items": [
-                    {
-                        "menu_item_id": first_item["id"],
-                        "quantity": 1,
-                        "customizations": {},
-                        "special_instructions": "No onions"
-                    }
-                ],
-                "special_instructions": "Deliver to room 305",
-                "customer_name": "Jane Smith",
-                "customer_phone": "+254722345678",
-                "order_type": "room_service",
-                "payment_method": "room_charge"
-            }
-        },
-        {
-            "name": "Takeaway with M-Pesa",
-            "data": {
-                "location": "Takeaway",
-                "location_type": "table",
-                "items": [
-                    {
-                        "menu_item_id": first_item["id"],
-                        "quantity": 3,
-                        "customizations": {},
-                        "special_instructions": ""
-                    }
-                ],
-                "special_instructions": "",
-                "customer_name": "Bob Johnson",
-                "customer_phone": "+254733456789",
-                "order_type": "walk_in",
-                "payment_method": "mpesa"
-            }
-        },
-        {
-            "name": "Dine-In with Card Payment",
-            "data": {
-                "location": "T-05",
-                "location_type": "table",
-                "items": [
-                    {
-                        "menu_item_id": first_item["id"],
-                        "quantity": 2,
-                        "customizations": {},
-                        "special_instructions": ""
-                    }
-                ],
-                "special_instructions": "",
-                "customer_name": "Alice Brown",
-                "customer_phone": "+254744567890",
-                "order_type": "dine_in",
-                "payment_method": "card"
-            }
-        }
-    ]
+    test_scenarios = [_with_item(s, first_item["id"]) for s in _SCENARIO_TEMPLATES]
 
-    created_orders = []
+    # The scenarios are independent once logged in, so they run concurrently;
+    # each one's output is printed once they're done
+    results = asyncio.run(_run_all(test_scenarios, first_item))
 
-    for i, scenario in enumerate(test_scenarios, 1):
-        print(f"\n{'='*70}")
-        print(f"3️⃣.{i} Testing: {scenario['name']}")
-        print(f"{'='*70}")
-
-        order_data = scenario['data']
-
-        print(f"   📝 Order Details:")
-        print(f"      Customer: {order_data['customer_name']}")
-        print(f"      Phone: {order_data['customer_phone']}")
-        print(f"      Type: {order_data['order_type']}")
-        print(f"      Payment: {order_data['payment_method']}")
-        print(f"      Location: {order_data['location']} ({order_data['location_type']})")
-        print(f"      Items: {order_data['items'][0]['quantity']} x {first_item['name']}")
-
-        try:
-            response = requests.post(f"{API_URL}/orders", json=order_data, headers=headers)
-            if response.status_code == 201:
-                created_order = response.json()
-                created_orders.append(created_order)
-
-                print(f"\n   ✅ Order created successfully!")
-                print(f"      Order Number: {created_order['order_number']}")
-                print(f"      Total Amount: KES {created_order['total_amount']}")
-                print(f"      Status: {created_order['status']}")
-
-                # Verify customer fields
-                order_id = created_order['id']
-                response = requests.get(f"{API_URL}/orders/{order_id}", headers=headers)
-                if response.status_code == 200:
-                    order_details = response.json()
-                    print(f"\n   🔍 Verifying saved fields:")
-                    print(f"      ✅ Customer Name: {order_details.get('customer_name', 'NOT SET')}")
-                    print(f"      ✅ Customer Phone: {order_details.get('customer_phone', 'NOT SET')}")
-                    print(f"      ✅ Order Type: {order_details.get('order_type', 'NOT SET')}")
-                    print(f"      ✅ Payment Method: {order_details.get('payment_method', 'NOT SET')}")
-                    print(f"      ✅ Created By Staff: {order_details.get('created_by_staff_id', 'NOT SET')}")
-
-                    if order_data['order_type'] == 'room_service':
-                        print(f"      ✅ Room Number: {order_details.get('room_number', 'NOT SET')}")
-                    elif order_data['order_type'] == 'dine_in':
-                        print(f"      ✅ Table Number: {order_details.get('table_number', 'NOT SET')}")
-            else:
-                print(f"   ❌ Order creation failed: {response.status_code}")
-                print(f"   Response: {response.text}")
-        except Exception as e:
-            print(f"   ❌ Error: {e}")
+    created_orders = []
+    for created_order, output in results:
+        print("\n".join(output))
+        if created_order is not None:
+            created_orders.append(created_order)
 
     # Final Summary
     print(f"\n{'='*70}")
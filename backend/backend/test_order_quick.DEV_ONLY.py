@@ -2,12 +2,18 @@
 """
 Quick order test with fresh user registration
 """
+import atexit
 import requests
 import json
 import time
 
 API_URL = "http://localhost:8000/api/v1"
 
+# One session for the whole run, so every call reuses a keep-alive connection;
+# closed on exit, including the early exit(1) paths
+session = requests.Session()
+atexit.register(session.close)
+
 print("🧪 Quick Order Flow Test\n")
 print("="*70)
 
@@ -25,7 +31,7 @@ register_data = {
 }
 
 try:
-    response = requests.post(f"{API_URL}/auth/register", json=register_data)
+    response = session.post(f"{API_URL}/auth/register", json=register_data)
     print(f"   Status: {response.status_code}")
 
     if response.status_code in [200, 201]:
@@ -40,10 +46,10 @@ except Exception as e:
     print(f"   ❌ Error: {e}")
     exit(1)
 
-headers = {
+session.headers.update({
     "Authorization": f"Bearer {access_token}",
     "Content-Type": "application/json"
-}
+})
 
 # Step 2: Create order with customer info and payment method
 print("\n2️⃣ Creating order with all customer fields...")
@@ -74,7 +80,7 @@ for key in ["customer_name", "customer_phone", "order_type", "payment_method"]:
     print(f"      {key}: {order_data[key]}")
 
 try:
-    response = requests.post(f"{API_URL}/orders", json=order_data, headers=headers)
+    response = session.post(f"{API_URL}/orders", json=order_data)
     print(f"\n   Response Status: {response.status_code}")
 
     if response.status_code == 201:
@@ -86,7 +92,7 @@ try:
         # Verify fields
         print(f"\n3️⃣ Verifying saved fields...")
         order_id = order.get('id')
-        verify = requests.get(f"{API_URL}/orders/{order_id}", headers=headers)
+        verify = session.get(f"{API_URL}/orders/{order_id}")
 
         if verify.status_code == 200:
             details = verify.json()
@@ -5,15 +5,17 @@ Usage:
     cd backend
     ./venv/bin/python3 backup_data.py
 
-Creates a timestamped JSON file in backend/backups/ with all critical table data.
-To restore: open the file and paste the INSERT statements into Supabase SQL Editor.
+Creates a timestamped, gzipped JSON file in backend/backups/ with all critical table data.
+To restore: gunzip the file, open it and paste the INSERT statements into Supabase SQL Editor.
 """
 
-import json
+import gzip
 import os
 import sys
 from datetime import datetime
 
+import orjson
+
 sys.path.insert(0, os.path.dirname(__file__))
 from dotenv import load_dotenv
 load_dotenv()
@@ -31,29 +33,76 @@ TABLES = [
     'users',
 ]
 
+# Supabase's default cap on rows returned by one select
+PAGE_SIZE = 1000
+
+def _pages(supabase, table):
+    """
+    Yield one table's rows a page at a time. Supabase returns at most
+    PAGE_SIZE rows per select, so pages are read until one comes back empty.
+    Pages are ordered by id; without a stable order Postgres may return rows
+    in a different order per request, and paging would repeat some rows and
+    miss others.
+    """
+    offset = 0
+    while True:
+        result = supabase.table(table).select('*').order('id').range(offset, offset + PAGE_SIZE - 1).execute()
+        if not result.data:
+            return
+        yield result.data
+        offset += len(result.data)
+
+
+def _write_table(f, table, pages, first):
+    """
+    Append one table to the backup's "tables" object, one row per line,
+    writing each page as it arrives. Returns (rows written, error); on an
+    error the rows written so far are kept and the array is closed.
+    """
+    f.write(b'\n' if first else b',\n')
+    f.write(b'    ' + orjson.dumps(table) + b': [')
+    count = 0
+    error = None
+    try:
+        for page in pages:
+            for row in page:
+                f.write(b',\n      ' if count else b'\n      ')
+                f.write(orjson.dumps(row, default=str, option=orjson.OPT_NAIVE_UTC))
+                count += 1
+    except Exception as e:
+        error = e
+    f.write(b'\n    ]' if count else b']')
+    return count, error
+
+
 def backup():
     supabase = SupabaseClient.get_admin_client()
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     backup_dir = os.path.join(os.path.dirname(__file__), 'backups')
     os.makedirs(backup_dir, exist_ok=True)
-    filename = os.path.join(backup_dir, f'backup_{timestamp}.json')
+    filename = os.path.join(backup_dir, f'backup_{timestamp}.json.gz')
+
+    total = 0
 
-    backup_data = {'timestamp': timestamp, 'tables': {}}
+    # Row data is repetitive (ids, statuses, timestamps) and compresses well;
+    # gzip compresses as each table is written
+    with gzip.open(filename, 'wb', compresslevel=6) as f:
+        f.write(b'{\n  "timestamp": ' + orjson.dumps(timestamp) + b',\n  "tables": {')
 
-    for table in TABLES:
-        try:
-            result = supabase.table(table).select('*').execute()
-            rows = result.data or []
-            backup_data['tables'][table] = rows
-            print(f'  OK  {table:<25} {len(rows)} rows')
-        except Exception as e:
-            print(f'  --  {table:<25} skipped ({e})')
-            backup_data['tables'][table] = []
+        # Tables are fetched and written one at a time, a page at a time, so
+        # at most one page of rows is in memory however large the tables get
+        for i, table in enumerate(TABLES):
+            count, error = _write_table(f, table, _pages(supabase, table), first=i == 0)
+            total += count
+            if error is None:
+                print(f'  OK  {table:<25} {count} rows')
+            elif count:
+                print(f'  --  {table:<25} incomplete after {count} rows ({error})')
+            else:
+                print(f'  --  {table:<25} skipped ({error})')
 
-    with open(filename, 'w') as f:
-        json.dump(backup_data, f, indent=2, default=str)
+        f.write(b'\n  }\n}\n')
 
-    total = sum(len(v) for v in backup_data['tables'].values())
     print(f'\nBackup saved → {filename}')
     print(f'Total rows backed up: {total}')
     print('\nTo restore a table from this backup, run restore_data.py')
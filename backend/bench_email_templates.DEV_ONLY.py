@@ -0,0 +1,98 @@
+"""
+Benchmark the ways an email template can be rendered.
+
+Compares, per template:
+  - from_string:   env.from_string(source).render(ctx)   (compile every call)
+  - get_template:  env.get_template(name).render(ctx)    (Environment LRU cache)
+  - compiled:      TEMPLATE.render(ctx)                  (module-level EmailTemplate)
+  - render:        the module's render(**ctx), if any     (order/payment: pre-split segments joined with values)
+
+Not shipped or run in production. Run from the backend directory:
+    ./venv/bin/python3 bench_email_templates.DEV_ONLY.py [iterations]
+"""
+
+import importlib
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.templates.emails._env import env
+
+ITERATIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+CONTEXTS = {
+    "booking_confirmation": {
+        "customer_name": "Jane Doe",
+        "booking_number": "BK-20260101-0001",
+        "room_type": "Deluxe Suite",
+        "check_in_date": "2026-01-01",
+        "check_out_date": "2026-01-03",
+        "num_guests": 2,
+        "total_amount": "12,000.00",
+        "hotel_website": "https://premierhotel.example",
+    },
+    "notification": {
+        "title": "Your order is ready",
+        "message": "Your order #42 is ready for pickup.",
+        "event_type": "order_ready",
+        "action_url": "https://premierhotel.example/my-orders",
+    },
+    "order_confirmation": {
+        "customer_name": "Jane Doe",
+        "order_number": "42",
+        "order_time": "12:30",
+        "delivery_location": "Room 204",
+        "estimated_time": 20,
+        "items": [
+            {"quantity": 2, "name": "Masala Tea", "special_instructions": "No sugar", "total_price": "300.00"},
+            {"quantity": 1, "name": "Chocolate Cake", "total_price": "450.00"},
+        ],
+        "total_amount": "750.00",
+        "hotel_website": "https://premierhotel.example",
+    },
+    "payment_receipt": {
+        "customer_name": "Jane Doe",
+        "payment_id": "PAY-0001",
+        "transaction_id": "QWE123RTY",
+        "payment_method": "mpesa",
+        "payment_date": "2026-01-01 12:30",
+        "reference_type": "booking",
+        "reference_number": "BK-20260101-0001",
+        "amount": "12,000.00",
+        "hotel_website": "https://premierhotel.example",
+    },
+}
+
+
+def bench(fn) -> float:
+    """Best of 5 runs, in microseconds per render"""
+    fn()
+    best = min(timeit.repeat(fn, number=ITERATIONS, repeat=5))
+    return best / ITERATIONS * 1e6
+
+
+def main():
+    print(f"📧 Email template render benchmark ({ITERATIONS} renders x 5 runs, best)\n")
+    print(f"{'template':<24}{'from_string':>14}{'get_template':>14}{'compiled':>14}{'render':>14}")
+    print("=" * 80)
+
+    for name, ctx in CONTEXTS.items():
+        module = importlib.import_module(f"app.templates.emails.{name}")
+        template_name = module.TEMPLATE_NAME
+        source = env.loader.get_source(env, template_name)[0]
+        compiled = module.TEMPLATE
+        render = getattr(module, "render", compiled.render)
+
+        results = [
+            bench(lambda: env.from_string(source).render(ctx)),
+            bench(lambda: env.get_template(template_name).render(ctx)),
+            bench(lambda: compiled.render(ctx)),
+            bench(lambda: render(**ctx)),
+        ]
+        print(f"{name:<24}" + "".join(f"{us:>12.1f}us" for us in results))
+
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,6 @@ Environment variables required (set in Render dashboard):
     SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASSWORD, BACKUP_EMAIL_RECIPIENT
 """
 
-import json
 import logging
 import os
 import smtplib
@@ -20,6 +19,8 @@ from email.mime.application import MIMEApplication
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
+import orjson
+
 sys.path.insert(0, os.path.dirname(__file__))
 from dotenv import load_dotenv
 load_dotenv()
@@ -82,7 +83,7 @@ def send_email(backup_data: dict, recipient: str) -> bool:
     timestamp = backup_data["timestamp"]
     date_label = f"{timestamp[:4]}-{timestamp[4:6]}-{timestamp[6:8]}"
     filename = f"premier_hotel_backup_{timestamp}.json"
-    json_bytes = json.dumps(backup_data, indent=2, default=str).encode("utf-8")
+    json_bytes = orjson.dumps(backup_data, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NAIVE_UTC)
 
     msg = MIMEMultipart()
     msg["Subject"] = f"Premier Hotel — Daily Backup {date_label}"
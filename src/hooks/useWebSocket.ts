@@ -175,39 +175,43 @@ export const useWebSocket = (options: UseWebSocketOptions = {}) => {
 
       ws.onmessage = (event) => {
         try {
-          const message: WebSocketMessage = JSON.parse(event.data);
-
-          if (message.type === 'connection_ack') {
-            if (process.env.NODE_ENV === 'development') {
-              console.log('Connection acknowledged:', message.data);
+          // The server coalesces bursts of events into a JSON array
+          const parsed = JSON.parse(event.data);
+          const messages: WebSocketMessage[] = Array.isArray(parsed) ? parsed : [parsed];
+
+          for (const message of messages) {
+            if (message.type === 'connection_ack') {
+              if (process.env.NODE_ENV === 'development') {
+                console.log('Connection acknowledged:', message.data);
+              }
+              continue;
             }
-            return;
-          }
 
-          if (message.type === 'pong') {
-            return;
-          }
+            if (message.type === 'pong') {
+              continue;
+            }
 
-          const handlers = eventHandlersRef.current.get(message.type);
-          if (handlers) {
-            handlers.forEach(handler => {
-              try {
-                handler(message.data);
-              } catch (error) {
-                console.error(`Error in event handler for ${message.type}:`, error);
-              }
-            });
-          }
+            const handlers = eventHandlersRef.current.get(message.type);
+            if (handlers) {
+              handlers.forEach(handler => {
+                try {
+                  handler(message.data);
+                } catch (error) {
+                  console.error(`Error in event handler for ${message.type}:`, error);
+                }
+              });
+            }
 
-          const wildcardHandlers = eventHandlersRef.current.get('*');
-          if (wildcardHandlers) {
-            wildcardHandlers.forEach(handler => {
-              try {
-                handler(message);
-              } catch (error) {
-                console.error('Error in wildcard event handler:', error);
-              }
-            });
+            const wildcardHandlers = eventHandlersRef.current.get('*');
+            if (wildcardHandlers) {
+              wildcardHandlers.forEach(handler => {
+                try {
+                  handler(message);
+                } catch (error) {
+                  console.error('Error in wildcard event handler:', error);
+                }
+              });
+            }
           }
 
         } catch (error) {